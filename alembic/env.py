@@ -10,6 +10,7 @@ from app.inventory.models import (
     Sale,
     Inventory,
     InventoryHistory,
+    DailyRevenue,
 )
 
 from config.database import Base
@@ -0,0 +1,59 @@
+"""tune indexes for hot queries
+
+Revision ID: 3f9c2b7d41e8
+Revises: 6a515e0039f2
+Create Date: 2025-06-02 09:41:17.552830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2b7d41e8'
+down_revision: Union[str, None] = '6a515e0039f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build indexes without blocking writes on Postgres; CONCURRENTLY cannot
+    # run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_sales_product_id_sale_date', 'sales', ['product_id', 'sale_date'], unique=False,
+                        postgresql_include=['quantity', 'total_price'], postgresql_concurrently=True)
+        op.create_index('ix_sales_sale_date_id', 'sales', ['sale_date', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_inventory_history_product_id_change_date', 'inventory_history',
+                        ['product_id', sa.text('change_date DESC')], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_products_category'), 'products', ['category'], unique=False,
+                        postgresql_concurrently=True)
+
+        # Superseded by the composite indexes above
+        op.drop_index(op.f('ix_sales_product_id'), table_name='sales', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_sales_sale_date'), table_name='sales', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_inventory_history_product_id'), table_name='inventory_history',
+                      postgresql_concurrently=True)
+
+        # Duplicates of the primary key indexes
+        op.drop_index(op.f('ix_products_id'), table_name='products', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_inventory_id'), table_name='inventory', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_sales_id'), table_name='sales', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_inventory_history_id'), table_name='inventory_history',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_inventory_history_id'), 'inventory_history', ['id'], unique=False)
+    op.create_index(op.f('ix_sales_id'), 'sales', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_id'), 'inventory', ['id'], unique=False)
+    op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_history_product_id'), 'inventory_history', ['product_id'], unique=False)
+    op.create_index(op.f('ix_sales_sale_date'), 'sales', ['sale_date'], unique=False)
+    op.create_index(op.f('ix_sales_product_id'), 'sales', ['product_id'], unique=False)
+    op.drop_index(op.f('ix_products_category'), table_name='products')
+    op.drop_index('ix_inventory_history_product_id_change_date', table_name='inventory_history')
+    op.drop_index('ix_sales_sale_date_id', table_name='sales')
+    op.drop_index('ix_sales_product_id_sale_date', table_name='sales')
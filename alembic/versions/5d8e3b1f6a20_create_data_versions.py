@@ -0,0 +1,41 @@
+"""create data versions
+
+Revision ID: 5d8e3b1f6a20
+Revises: e4a7d09b2c15
+Create Date: 2025-07-21 09:41:12.508317
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e3b1f6a20'
+down_revision: Union[str, None] = 'e4a7d09b2c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows the counters are spread over; app.inventory.data_versions.SHARDS
+SHARDS = 16
+
+
+def upgrade() -> None:
+    data_versions = op.create_table('data_versions',
+    sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('inventory', sa.BigInteger(), nullable=False),
+    sa.Column('sales', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+    # Counters start at the creation time, so a recreated table does not
+    # repeat versions that ETags were already issued for
+    start = int(time.time())
+    op.bulk_insert(data_versions, [
+        {'shard': shard, 'inventory': start, 'sales': start} for shard in range(SHARDS)
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
@@ -0,0 +1,52 @@
+"""create daily revenue rollup
+
+Revision ID: 6a515e0039f2
+Revises: d0ee31999e45
+Create Date: 2025-05-24 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a515e0039f2'
+down_revision: Union[str, None] = 'd0ee31999e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_revenue',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total_revenue', sa.Float(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=False),
+    sa.Column('sale_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'category')
+    )
+    op.create_index('ix_daily_revenue_category_day', 'daily_revenue', ['category', 'day'], unique=False)
+
+    # Backfill from existing sales history, leaving out soft-deleted sales as
+    # rebuild_daily_revenue does
+    op.execute(
+        """
+        INSERT INTO daily_revenue
+            (day, product_id, category, total_revenue, total_quantity, sale_count)
+        SELECT s.sale_date, s.product_id, p.category,
+               SUM(s.total_price), SUM(s.quantity), COUNT(s.id)
+        FROM sales s
+        JOIN products p ON p.id = s.product_id
+        WHERE s.is_deleted = false
+        GROUP BY s.sale_date, s.product_id, p.category
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_revenue_category_day', table_name='daily_revenue')
+    op.drop_table('daily_revenue')
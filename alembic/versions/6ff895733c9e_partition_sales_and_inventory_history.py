@@ -0,0 +1,136 @@
+"""partition sales and inventory history by month
+
+Revision ID: 6ff895733c9e
+Revises: 3f9c2b7d41e8
+Create Date: 2025-06-09 14:05:52.907311
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ff895733c9e'
+down_revision: Union[str, None] = '3f9c2b7d41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of empty partitions to create ahead of today; afterwards
+# `python -m app.inventory.partitions ensure` keeps them coming
+MONTHS_AHEAD = 12
+
+COMMON_COLUMNS = """
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    is_deleted BOOLEAN NOT NULL,
+    deleted_at TIMESTAMP WITHOUT TIME ZONE
+"""
+
+TABLES = {
+    'sales': {
+        'partition_by': 'sale_date',
+        'columns': """
+            id INTEGER NOT NULL DEFAULT nextval('sales_id_seq'),
+            product_id INTEGER NOT NULL REFERENCES products (id),
+            quantity INTEGER NOT NULL,
+            sale_date DATE NOT NULL,
+            total_price FLOAT NOT NULL,
+        """,
+        'indexes': [
+            "CREATE INDEX ix_sales_product_id_sale_date ON sales (product_id, sale_date) "
+            "INCLUDE (quantity, total_price)",
+            "CREATE INDEX ix_sales_sale_date_id ON sales (sale_date, id)",
+        ],
+    },
+    'inventory_history': {
+        'partition_by': 'change_date',
+        'columns': """
+            id INTEGER NOT NULL DEFAULT nextval('inventory_history_id_seq'),
+            product_id INTEGER NOT NULL REFERENCES inventory (product_id),
+            old_quantity INTEGER NOT NULL,
+            new_quantity INTEGER NOT NULL,
+            change_date TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+        """,
+        'indexes': [
+            "CREATE INDEX ix_inventory_history_product_id_change_date "
+            "ON inventory_history (product_id, change_date DESC)",
+        ],
+    },
+}
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _first_month(table: str, column: str) -> date:
+    current = date.today().replace(day=1)
+    if context.is_offline_mode():
+        return current
+    oldest = op.get_bind().execute(sa.text(f"SELECT min({column}) FROM {table}")).scalar()
+    if oldest is None:
+        return current
+    if isinstance(oldest, datetime):
+        oldest = oldest.date()
+    return min(oldest.replace(day=1), current)
+
+
+def upgrade() -> None:
+    # Declarative partitioning is Postgres only; other databases keep plain tables
+    if context.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, spec in TABLES.items():
+        column = spec['partition_by']
+        legacy = f'{table}_unpartitioned'
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        for index in spec['indexes']:
+            op.execute(f"DROP INDEX {index.split()[2]}")
+
+        # The partition key has to be part of the primary key
+        op.execute(
+            f"CREATE TABLE {table} ({spec['columns']} {COMMON_COLUMNS}, "
+            f"PRIMARY KEY (id, {column})) PARTITION BY RANGE ({column})"
+        )
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        month = _first_month(legacy, column)
+        last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+            )
+            month = _add_months(month, 1)
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy}")
+        for index in spec['indexes']:
+            op.execute(index)
+
+
+def downgrade() -> None:
+    if context.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, spec in TABLES.items():
+        partitioned = f'{table}_partitioned'
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        for index in spec['indexes']:
+            op.execute(f"DROP INDEX {index.split()[2]}")
+
+        op.execute(f"CREATE TABLE {table} ({spec['columns']} {COMMON_COLUMNS}, PRIMARY KEY (id))")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned}")
+        for index in spec['indexes']:
+            op.execute(index)
@@ -0,0 +1,38 @@
+"""create inventory history daily summaries
+
+Revision ID: 9b4e2c7a1d63
+Revises: 6ff895733c9e
+Create Date: 2025-06-16 09:41:27.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2c7a1d63'
+down_revision: Union[str, None] = '6ff895733c9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by `python -m app.inventory.retention` from raw rows it deletes
+    op.create_table('inventory_history_daily',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('open_quantity', sa.Integer(), nullable=False),
+    sa.Column('close_quantity', sa.Integer(), nullable=False),
+    sa.Column('min_quantity', sa.Integer(), nullable=False),
+    sa.Column('max_quantity', sa.Integer(), nullable=False),
+    sa.Column('change_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['inventory.product_id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    # The raw rows behind compacted days are gone; dropping the summaries loses them
+    op.drop_table('inventory_history_daily')
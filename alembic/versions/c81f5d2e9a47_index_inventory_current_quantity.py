@@ -0,0 +1,30 @@
+"""index inventory current quantity
+
+Revision ID: c81f5d2e9a47
+Revises: 9b4e2c7a1d63
+Create Date: 2025-06-23 11:08:35.214976
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5d2e9a47'
+down_revision: Union[str, None] = '9b4e2c7a1d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build without blocking stock updates on Postgres; CONCURRENTLY cannot
+    # run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_inventory_current_quantity_product_id', 'inventory',
+                        ['current_quantity', 'product_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_current_quantity_product_id', table_name='inventory')
@@ -0,0 +1,90 @@
+"""partial indexes on live rows
+
+Revision ID: e4a7d09b2c15
+Revises: c81f5d2e9a47
+Create Date: 2025-07-14 10:22:41.630518
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7d09b2c15'
+down_revision: Union[str, None] = 'c81f5d2e9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Spelled as SQLAlchemy renders `is_deleted == false()`, so the planners
+# can match the queries' predicate against the indexes'
+LIVE_ROWS = {'postgresql': 'is_deleted = false', 'sqlite': 'is_deleted = 0'}
+
+# name: (table, columns, INCLUDE columns on Postgres, partitioned on Postgres)
+INDEXES = {
+    'ix_sales_product_id_sale_date': ('sales', 'product_id, sale_date', 'quantity, total_price', True),
+    'ix_sales_sale_date_id': ('sales', 'sale_date, id', None, True),
+    'ix_inventory_history_product_id_change_date': ('inventory_history', 'product_id, change_date DESC',
+                                                    None, True),
+    'ix_inventory_current_quantity_product_id': ('inventory', 'current_quantity, product_id', None, False),
+    'ix_products_category': ('products', 'category', None, False),
+}
+
+
+def _partitions(table: str) -> list[str]:
+    return list(op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {'table': table}).scalars())
+
+
+def _rebuild_postgres(where: str | None) -> None:
+    # Each index is built under a temporary name next to the one it replaces,
+    # so queries keep an index throughout; CONCURRENTLY cannot run inside a
+    # transaction block
+    predicate = f" WHERE {where}" if where else ""
+    with op.get_context().autocommit_block():
+        for name, (table, columns, include, partitioned) in INDEXES.items():
+            definition = f"({columns})" + (f" INCLUDE ({include})" if include else "") + predicate
+            new = f"{name}_new"
+            if partitioned:
+                # Partitioned tables cannot be indexed concurrently: create the
+                # parent index empty, build each partition's concurrently and
+                # attach it, which makes the parent index valid once complete
+                op.execute(f"CREATE INDEX {new} ON ONLY {table} {definition}")
+                partitions = _partitions(table)
+                suffix = name.removeprefix(f"ix_{table}_")
+                for partition in partitions:
+                    op.execute(f"CREATE INDEX CONCURRENTLY {partition}_{suffix}_new ON {partition} {definition}")
+                    op.execute(f"ALTER INDEX {new} ATTACH PARTITION {partition}_{suffix}_new")
+                # Dropping a partitioned index takes a brief exclusive lock; it
+                # also drops the partitions' indexes, freeing their names
+                op.execute(f"DROP INDEX {name}")
+                for partition in partitions:
+                    op.execute(f"ALTER INDEX {partition}_{suffix}_new RENAME TO {partition}_{suffix}_idx")
+            else:
+                op.execute(f"CREATE INDEX CONCURRENTLY {new} ON {table} {definition}")
+                op.execute(f"DROP INDEX CONCURRENTLY {name}")
+            op.execute(f"ALTER INDEX {new} RENAME TO {name}")
+
+
+def _rebuild(where: str | None) -> None:
+    if context.get_context().dialect.name == 'postgresql':
+        _rebuild_postgres(where)
+        return
+
+    for name, (table, columns, _, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, [sa.text(column) for column in columns.split(', ')], unique=False,
+                        sqlite_where=sa.text(where) if where else None)
+
+
+def upgrade() -> None:
+    _rebuild(LIVE_ROWS.get(context.get_context().dialect.name))
+
+
+def downgrade() -> None:
+    _rebuild(None)
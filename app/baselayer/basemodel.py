@@ -1,9 +1,15 @@
 import datetime
 
-from sqlalchemy import Column, Integer, DateTime, Boolean, event
+from sqlalchemy import Column, Integer, DateTime, Boolean, event, false
+from sqlalchemy.orm import Session, with_loader_criteria
 
 from config.database import Base
 
+# Execution option that lets a statement see soft-deleted rows, e.g.
+# `db.execute(stmt, execution_options={INCLUDE_DELETED: True})` or
+# `query.execution_options(include_deleted=True)`
+INCLUDE_DELETED = "include_deleted"
+
 
 def utc_now():
     """Return the current UTC datetime as a timezone-aware object."""
@@ -11,11 +17,14 @@ def utc_now():
 
 
 class BaseModel(Base):
-    """A base model that includes common fields and soft delete functionality."""
+    """
+    A base model that includes common fields and soft delete functionality.
+    ORM selects skip soft-deleted rows unless run with INCLUDE_DELETED.
+    """
 
     __abstract__ = True
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     created_at = Column(DateTime, default=utc_now, nullable=False)
     updated_at = Column(DateTime, default=utc_now, nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False)
@@ -37,3 +46,33 @@ class BaseModel(Base):
 
 # Attach event listeners to update 'updated_at' field on update
 event.listen(BaseModel, "before_update", BaseModel.on_update)
+
+
+def exclude_deleted(statement):
+    """
+    `statement` with soft-deleted rows of every BaseModel entity filtered out,
+    for statements run without the session, e.g. through COPY.
+    """
+    if statement.get_execution_options().get(INCLUDE_DELETED):
+        return statement
+    return statement.options(
+        with_loader_criteria(
+            BaseModel,
+            # Spelled like the partial index predicates so the planner uses them
+            lambda cls: cls.is_deleted == false(),
+            include_aliases=True,
+        )
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted(execute_state):
+    # Column and relationship loads inherit the criteria of the statement
+    # that loaded their parent
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED)
+    ):
+        execute_state.statement = exclude_deleted(execute_state.statement)
@@ -1,7 +1,15 @@
-from typing import Union
+from functools import lru_cache
+from typing import Any, Union
 
-from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi import Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """Return a cached TypeAdapter; building one compiles a pydantic-core schema."""
+    return TypeAdapter(response_type)
 
 
 class FastResponder:
@@ -32,7 +40,7 @@ class FastResponder:
         payload: dict = None,
         message: str = "",
         **kwargs
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """
         Generates a JSON response based on provided parameters.
 
@@ -40,16 +48,43 @@ class FastResponder:
         :param status_code: HTTP status code of the response.
         :param payload: Data returned by the API.
         :param message: Message explaining the status.
-        :return: JSONResponse object.
+        :return: ORJSONResponse object.
         """
         body = FastResponder.make_response_body(success, payload, message)
-        return JSONResponse(content=body, status_code=status_code, **kwargs)
+        return ORJSONResponse(content=body, status_code=status_code, **kwargs)
+
+    @staticmethod
+    def send_model_response(
+        response_type: Any,
+        content: Any,
+        status_code: int = status.HTTP_200_OK,
+        **kwargs
+    ) -> Response:
+        """
+        Generates a JSON response by validating `content` as `response_type` and
+        encoding it in one pass through pydantic-core, instead of FastAPI's
+        response_model handling which validates, converts to Python objects and
+        JSON-encodes every row separately.
+
+        :param response_type: The response model, e.g. List[SaleResponse].
+        :param content: Data to serialize; ORM objects and rows are read by attribute.
+        :param status_code: HTTP status code of the response.
+        :return: Response object with the encoded JSON body.
+        """
+        adapter = type_adapter(response_type)
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type="application/json",
+            **kwargs
+        )
 
     # Convenience methods for common response scenarios
     @staticmethod
     def send_success_response(
         message: str, payload: Union[dict, list] = {}, **kwargs
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Returns a success response."""
         return FastResponder.send_response(
             status_code=status.HTTP_200_OK, payload=payload, message=message, **kwargs
@@ -58,7 +93,7 @@ class FastResponder:
     @staticmethod
     def send_created_response(
         message: str, payload: dict = None, **kwargs
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Returns a response for successfully creating an item."""
         return FastResponder.send_response(
             status_code=status.HTTP_201_CREATED,
@@ -68,14 +103,14 @@ class FastResponder:
         )
 
     @staticmethod
-    def send_bad_request_response(message: str) -> JSONResponse:
+    def send_bad_request_response(message: str) -> ORJSONResponse:
         """Returns a bad request response."""
         return FastResponder.send_response(
             success=False, status_code=status.HTTP_400_BAD_REQUEST, message=message
         )
 
     @staticmethod
-    def send_not_found_response(message: str = "Not found.") -> JSONResponse:
+    def send_not_found_response(message: str = "Not found.") -> ORJSONResponse:
         """Returns a not found response."""
         return FastResponder.send_response(
             success=False, status_code=status.HTTP_404_NOT_FOUND, message=message
@@ -84,7 +119,7 @@ class FastResponder:
     @staticmethod
     def send_internal_server_error_response(
         message: str = "System is down. Please try again in a while.",
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Returns an internal server error response."""
         return FastResponder.send_response(
             success=False,
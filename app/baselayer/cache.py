@@ -0,0 +1,305 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+import orjson
+
+
+@dataclass
+class CacheScope:
+    """
+    The slice of data a cached value was computed from: an inclusive date span
+    (None meaning unbounded) and a category (None meaning every category).
+    """
+
+    start: Optional[date] = None
+    end: Optional[date] = None
+    category: Optional[str] = None
+
+    def covers(self, day: date, category: Optional[str] = None) -> bool:
+        """Whether a write on `day` for `category` (None: any) can change the value."""
+        if self.start is not None and day < self.start:
+            return False
+        if self.end is not None and day > self.end:
+            return False
+        return self.category is None or category is None or self.category == category
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+            "category": self.category,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CacheScope":
+        return cls(
+            start=date.fromisoformat(data["start"]) if data["start"] else None,
+            end=date.fromisoformat(data["end"]) if data["end"] else None,
+            category=data["category"],
+        )
+
+
+class CacheBackend:
+    """
+    Interface for result caches whose entries are invalidated by the date span
+    and category they were computed from. `ttl` of 0 means no expiry.
+    """
+
+    # Whether calls do network I/O, which must not run on the event loop
+    blocking = False
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """Return (found, value)."""
+        raise NotImplementedError
+
+    def generation(self) -> int:
+        """
+        Counter bumped by every invalidation. Callers read it before computing a
+        value and pass it to `set`, which drops the value if a write happened in
+        between, so a result computed from pre-write data is never cached.
+        """
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: tuple,
+        value: Any,
+        scope: CacheScope,
+        ttl: float,
+        generation: Optional[int] = None,
+    ):
+        raise NotImplementedError
+
+    def invalidate(self, day: date, category: Optional[str] = None) -> int:
+        """Drop every entry whose scope covers a write on `day`; return how many."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        return None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self).__name__,
+                "entries": self.size(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+class InMemoryLRUCache(CacheBackend):
+    """Bounded, per-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._count("hits")
+                    return True, value
+                del self._entries[key]
+        self._count("misses")
+        return False, None
+
+    def generation(self):
+        return self._generation
+
+    def set(self, key, value, scope, ttl, generation=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, scope, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    def invalidate(self, day, category=None):
+        with self._lock:
+            stale = [
+                key
+                for key, (_, scope, _) in self._entries.items()
+                if scope.covers(day, category)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+        self._count("invalidations", len(stale))
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def size(self):
+        return len(self._entries)
+
+
+# Stores a value and adds its key to the set of its scope, atomically and
+# only if no invalidation bumped the generation since the value was computed.
+# A scope set lives as long as its longest-lived entry (for ever if one has
+# no TTL) and the index is scored with that expiry, so it can be trimmed.
+_SET_SCRIPT = """
+local generation = redis.call('GET', KEYS[4]) or '0'
+if ARGV[3] ~= '' and ARGV[3] ~= generation then
+    return 0
+end
+local ttl = tonumber(ARGV[2])
+local remaining = redis.call('TTL', KEYS[2])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+redis.call('SADD', KEYS[2], KEYS[1])
+if ttl == 0 then
+    redis.call('PERSIST', KEYS[2])
+    redis.call('ZADD', KEYS[3], '+inf', KEYS[2])
+elseif remaining ~= -1 and remaining < ttl then
+    redis.call('EXPIRE', KEYS[2], ttl)
+    redis.call('ZADD', KEYS[3], tonumber(ARGV[4]) + ttl, KEYS[2])
+end
+return 1
+"""
+
+# Deletes a scope set with the entries it holds and returns how many of them
+# were still live.
+_DROP_SCRIPT = """
+local members = redis.call('SMEMBERS', KEYS[1])
+local removed = 0
+for i = 1, #members, 1000 do
+    removed = removed + redis.call('DEL', unpack(members, i, math.min(i + 999, #members)))
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], KEYS[1])
+return removed
+"""
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by every worker through Redis. Values are stored as JSON
+    under `<prefix>:value:<key hash>`, and each value's key is added to the set
+    of its scope, `<prefix>:scope:<scope>`, which expires with its entries.
+    The `<prefix>:scope-index` sorted set lists the live scopes, scored by
+    expiry, so a write only looks up the scopes there are entries for.
+    Size is bounded by Redis' own maxmemory eviction policy.
+
+    JSON turns dates into ISO strings; response models parse them back.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str):
+        super().__init__()
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._index = f"{prefix}:scope-index"
+        self._scope_prefix = f"{prefix}:scope:"
+        self._generation_key = f"{prefix}:generation"
+        self._set_script = self._redis.register_script(_SET_SCRIPT)
+        self._drop_script = self._redis.register_script(_DROP_SCRIPT)
+
+    def _key(self, key: tuple) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f"{self._prefix}:value:{digest}"
+
+    def _scope_key(self, scope: CacheScope) -> str:
+        return self._scope_prefix + json.dumps(scope.to_dict(), sort_keys=True)
+
+    def _live_scopes(self) -> list[str]:
+        self._redis.zremrangebyscore(self._index, "-inf", time.time())
+        return [key.decode() for key in self._redis.zrange(self._index, 0, -1)]
+
+    def _drop(self, scope_keys: list[str]) -> int:
+        pipe = self._redis.pipeline(transaction=False)
+        for scope_key in scope_keys:
+            self._drop_script(keys=[scope_key, self._index], client=pipe)
+        return sum(pipe.execute())
+
+    def get(self, key):
+        raw = self._redis.get(self._key(key))
+        if raw is None:
+            self._count("misses")
+            return False, None
+        self._count("hits")
+        return True, orjson.loads(raw)
+
+    def generation(self):
+        return int(self._redis.get(self._generation_key) or 0)
+
+    def set(self, key, value, scope, ttl, generation=None):
+        self._set_script(
+            keys=[
+                self._key(key),
+                self._scope_key(scope),
+                self._index,
+                self._generation_key,
+            ],
+            args=[
+                orjson.dumps(value),
+                max(int(ttl), 1) if ttl else 0,
+                "" if generation is None else generation,
+                time.time(),
+            ],
+        )
+
+    def invalidate(self, day, category=None):
+        self._redis.incr(self._generation_key)
+        stale = [
+            scope_key
+            for scope_key in self._live_scopes()
+            if CacheScope.from_dict(
+                json.loads(scope_key[len(self._scope_prefix) :])
+            ).covers(day, category)
+        ]
+        removed = self._drop(stale) if stale else 0
+        self._count("invalidations", removed)
+        return removed
+
+    def clear(self):
+        self._drop(self._live_scopes())
+        self._redis.incr(self._generation_key)
+
+    def size(self):
+        return sum(
+            1
+            for _ in self._redis.scan_iter(match=f"{self._prefix}:value:*", count=1000)
+        )
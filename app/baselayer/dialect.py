@@ -0,0 +1,69 @@
+import csv
+import io
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.baselayer.basemodel import exclude_deleted
+
+
+def dialect_name(db: Session) -> str:
+    """Return the name of the SQL dialect the session is bound to."""
+    return db.get_bind().dialect.name
+
+
+def upsert_insert(db: Session, table):
+    """
+    Return an INSERT construct for `table` that supports `on_conflict_do_update`
+    on the dialect the session is bound to.
+    """
+    name = dialect_name(db)
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {name}")
+
+
+def supports_copy(db: Session) -> bool:
+    """Whether the session's driver can stream rows with Postgres COPY."""
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def copy_rows(db: Session, table, columns: list[str], rows: list[tuple]):
+    """
+    Load `rows` into `table` with COPY ... FROM STDIN on the session's current
+    connection, so the load is part of the caller's transaction.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def copy_query(db: Session, query) -> io.BytesIO:
+    """
+    Run `query` with COPY (...) TO STDOUT on the session's current connection
+    and return its result as CSV, skipping per-row object creation entirely.
+    Soft-deleted rows are left out as the session would.
+    """
+    compiled = exclude_deleted(query).compile(dialect=db.get_bind().dialect)
+    buffer = io.BytesIO()
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        # mogrify binds the parameters client side, as COPY does not take any
+        sql = cursor.mogrify(str(compiled), compiled.params).decode()
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    buffer.seek(0)
+    return buffer
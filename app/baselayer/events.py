@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from config.logging_utils import logger
+
+
+class EventBroker:
+    """
+    Interface for fan-out of events to the clients currently listening on a
+    channel. Writers publish after committing; events are not stored, so a
+    subscriber only sees what is published while it is subscribed.
+
+    `publish` may be called from any thread. `subscribe` yields a bounded
+    asyncio.Queue of event dicts on the caller's event loop; when a slow
+    subscriber's queue is full, further events for it are dropped and logged.
+    """
+
+    # Whether `publish` does network I/O, which must not run on the event loop
+    blocking = False
+
+    def publish(self, channel: str, event: dict):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str):
+        """Async context manager yielding an asyncio.Queue of events."""
+        raise NotImplementedError
+
+
+def _offer(queue: asyncio.Queue, channel: str, event: dict):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        logger.warning(
+            {
+                "method": "event_broker",
+                "message": "Subscriber queue full, event dropped",
+                "channel": channel,
+            }
+        )
+
+
+class InMemoryEventBroker(EventBroker):
+    """Per-process broker; only events published by this process are seen."""
+
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._subscribers: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            # Writers run in threadpool threads; hand over on the queue's loop
+            loop.call_soon_threadsafe(_offer, queue, channel, event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel) -> AsyncIterator[asyncio.Queue]:
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self._queue_size))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+
+
+class RedisEventBroker(EventBroker):
+    """Broker shared by every worker through Redis pub/sub."""
+
+    blocking = True
+
+    def __init__(self, url: str, queue_size: int, prefix: str = "events:"):
+        import redis
+
+        self._url = url
+        self._redis = redis.Redis.from_url(url)
+        self._queue_size = queue_size
+        self._prefix = prefix
+
+    def publish(self, channel, event):
+        self._redis.publish(self._prefix + channel, json.dumps(event))
+
+    @asynccontextmanager
+    async def subscribe(self, channel) -> AsyncIterator[asyncio.Queue]:
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._prefix + channel)
+        queue = asyncio.Queue(self._queue_size)
+
+        async def relay():
+            async for message in pubsub.listen():
+                _offer(queue, channel, json.loads(message["data"]))
+
+        task = asyncio.create_task(relay())
+        try:
+            yield queue
+        finally:
+            task.cancel()
+            await pubsub.aclose()
+            await client.aclose()
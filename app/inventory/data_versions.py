@@ -0,0 +1,50 @@
+import random
+from typing import Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.baselayer.dialect import upsert_insert
+from app.inventory.models import DataVersion
+
+# Names of the data whose changes are counted; columns of data_versions
+INVENTORY = "inventory"
+SALES = "sales"
+
+# Rows the counters are spread over. A writer locks one of them, picked at
+# random, from its bump until it commits.
+SHARDS = 16
+
+
+def bump_versions(db: Session, *names: str):
+    """
+    Record that the named data changed, inside the caller's transaction and
+    right before it commits, so the counters commit and replicate together
+    with the data and the row lock is held only while committing.
+
+    Writers outside the application must do the same, e.g.
+    `UPDATE data_versions SET sales = sales + 1 WHERE shard = 0`.
+    """
+    table = DataVersion.__table__
+    stmt = upsert_insert(db, table).values(
+        shard=random.randrange(SHARDS), **{name: 1 for name in names}
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.shard],
+            set_={name: table.c[name] + 1 for name in names},
+        )
+    )
+
+
+def read_versions(db: Session, names: Sequence[str]) -> dict[str, int]:
+    """
+    Current version of each named data: the sum of its counters, which grows
+    with every committed write. Read it on the session that reads the data and
+    before reading it, so the data is at least as new as the version.
+    """
+    table = DataVersion.__table__
+    row = db.execute(
+        select(*(func.coalesce(func.sum(table.c[name]), 0) for name in names))
+    ).one()
+    return {name: int(version) for name, version in zip(names, row)}
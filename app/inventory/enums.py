@@ -1 +1,18 @@
+from enum import Enum
 
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+class LeaderboardPeriod(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+class LeaderboardMetric(str, Enum):
+    REVENUE = "revenue"
+    QUANTITY = "quantity"
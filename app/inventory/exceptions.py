@@ -0,0 +1,13 @@
+class OutOfStockError(ValueError):
+    """Raised when a sale asks for more units than the product has in stock."""
+
+    def __init__(self, product_id: int, quantity: int):
+        self.product_id = product_id
+        self.quantity = quantity
+        super().__init__(
+            f"Insufficient stock for product {product_id} to sell {quantity} units"
+        )
+
+
+class SaleQueueFullError(RuntimeError):
+    """Raised when the group-commit queue stays full for longer than the caller waits."""
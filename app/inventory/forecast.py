@@ -0,0 +1,171 @@
+from datetime import date, timedelta
+from itertools import chain
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.baselayer.dialect import copy_query, dialect_name, supports_copy
+from app.inventory.models import DailyRevenue, Inventory, Product
+from config.config import settings
+
+# Rows fetched per round trip where the matrix cannot be read with COPY
+FETCH_CHUNK_SIZE = 100000
+
+
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _day_offset(db: Session, day, start_date: date):
+    """SQL expression for the number of days between `start_date` and `day`."""
+    if dialect_name(db) == "postgresql":
+        return day - start_date
+    return cast(func.julianday(day) - func.julianday(start_date), Integer)
+
+
+def _fetch_integers(db: Session, query, width: int):
+    """
+    Rows of an all-integer `query` as an (n x width) int64 array, through COPY
+    on Postgres/psycopg2 and fetched in chunks elsewhere.
+    """
+    import numpy as np
+
+    if supports_copy(db):
+        buffer = copy_query(db, query)
+        if not buffer.getbuffer().nbytes:
+            return np.empty((0, width), dtype=np.int64)
+        return np.loadtxt(buffer, delimiter=",", dtype=np.int64, ndmin=2)
+
+    result = db.execute(query, execution_options={"yield_per": FETCH_CHUNK_SIZE})
+    chunks = [
+        # fromiter over the flattened rows skips building per-row arrays
+        np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width)
+        for rows in result.partitions()
+    ]
+    if not chunks:
+        return np.empty((0, width), dtype=np.int64)
+    return np.concatenate(chunks).reshape(-1, width)
+
+
+def _load_stock(db: Session, category: str | None):
+    """(product_ids, current_quantities) of every stocked product, by product id."""
+    query = select(Inventory.product_id, Inventory.current_quantity).order_by(
+        Inventory.product_id
+    )
+    if category:
+        query = query.join(Product).where(Product.category == category)
+    stock = _fetch_integers(db, query, 2)
+    return stock[:, 0], stock[:, 1]
+
+
+def _load_demand(
+    db: Session, product_ids, start_date: date, days: int, category: str | None
+):
+    """
+    Units sold per product and day as a dense (products x days) matrix, read
+    from the daily_revenue rollup with one query. Column 0 is `start_date`.
+    `product_ids` are sorted, so the query is bounded to their id range.
+    """
+    import numpy as np
+
+    if not len(product_ids):
+        return np.zeros((0, days))
+
+    query = select(
+        DailyRevenue.product_id,
+        _day_offset(db, DailyRevenue.day, start_date),
+        DailyRevenue.total_quantity,
+    ).where(
+        DailyRevenue.day.between(start_date, start_date + timedelta(days - 1)),
+        DailyRevenue.product_id.between(int(product_ids[0]), int(product_ids[-1])),
+    )
+    if category:
+        query = query.where(DailyRevenue.category == category)
+    rows = _fetch_integers(db, query, 3)
+
+    # Map product ids to matrix rows; products without stock are skipped
+    index = np.minimum(np.searchsorted(product_ids, rows[:, 0]), len(product_ids) - 1)
+    keep = product_ids[index] == rows[:, 0]
+    demand = np.bincount(
+        index[keep] * days + rows[keep, 1],
+        weights=rows[keep, 2],
+        minlength=len(product_ids) * days,
+    )
+    return demand.reshape(len(product_ids), days)
+
+
+def forecast_velocity(demand, window: int, alpha: float):
+    """
+    Daily sales velocity of every row of `demand` (oldest day first): the mean
+    of the last `window` days, and an exponentially weighted mean over the
+    whole history where each day weighs `1 - alpha` times the day after it.
+    """
+    import numpy as np
+
+    days = demand.shape[1]
+    moving_average = demand[:, -window:].mean(axis=1)
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1)
+    ewma = demand @ (weights / weights.sum())
+    return moving_average, ewma
+
+
+def forecast_stockouts(
+    db: Session,
+    history_days: int,
+    window: int,
+    alpha: float,
+    category: str | None = None,
+    limit: int | None = None,
+    end_date: date | None = None,
+) -> dict:
+    """
+    Sales velocity and days until stock-out of every stocked product (or every
+    product in `category`) from the last `history_days` days up to and
+    including `end_date` (default today).
+
+    Days of cover divide current stock by the exponentially weighted velocity;
+    products that did not sell get None. Returns columns (lists of equal
+    length), soonest stock-out first and products that did not sell last,
+    cut to the first `limit` products and ready to be zipped into rows.
+    """
+    import numpy as np
+
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=history_days - 1)
+    product_ids, stock = _load_stock(db, category)
+    # The demand matrix is built FORECAST_CHUNK_PRODUCTS products at a time,
+    # so its memory does not grow with the catalog
+    chunk = settings.FORECAST_CHUNK_PRODUCTS
+    moving_average = np.zeros(len(product_ids))
+    ewma = np.zeros(len(product_ids))
+    for start in range(0, len(product_ids), chunk):
+        rows = slice(start, start + chunk)
+        demand = _load_demand(db, product_ids[rows], start_date, history_days, category)
+        moving_average[rows], ewma[rows] = forecast_velocity(
+            demand, min(window, history_days), alpha
+        )
+
+    selling = ewma > 0
+    cover = np.zeros(len(product_ids))
+    np.divide(np.maximum(stock, 0), ewma, out=cover, where=selling)
+    # Dates past date.max cannot be represented; those products never run out
+    horizon = (date.max - end_date).days
+    dated = selling & (cover <= horizon)
+    stockout = np.datetime64(end_date, "D") + np.where(dated, cover, 0).astype(np.int64)
+
+    order = np.lexsort((product_ids, np.where(selling, cover, np.inf)))[:limit]
+    columns = {
+        "product_id": product_ids,
+        "current_quantity": stock,
+        "moving_average_velocity": np.round(moving_average, 4),
+        "ewma_velocity": np.round(ewma, 4),
+        "days_until_stockout": np.where(
+            selling, np.round(cover, 2).astype(object), None
+        ),
+        "stockout_date": np.where(dated, stockout.astype(object), None),
+    }
+    return {name: values[order].tolist() for name, values in columns.items()}
@@ -0,0 +1,142 @@
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+
+from app.inventory.exceptions import SaleQueueFullError
+from app.inventory.services import create_sales_grouped
+from config.config import settings
+from config.database import session_scope
+from config.logging_utils import logger
+
+
+def _commit_group(sales: list[dict]) -> list:
+    """
+    Commit `sales` together and return their results in order. When the
+    whole group fails, e.g. on a deadlock or a stock change between the read
+    and the decrement, its halves are retried on their own, so the error only
+    reaches the sales that cause it and the others are still written.
+    """
+    try:
+        with session_scope() as db:
+            return create_sales_grouped(db, sales)
+    except Exception as exc:
+        logger.error(
+            {
+                "method": "SaleGroupWriter",
+                "message": "Sale group failed",
+                "group_size": len(sales),
+                "error": str(exc),
+            }
+        )
+        if len(sales) == 1:
+            return [exc]
+        middle = len(sales) // 2
+        return _commit_group(sales[:middle]) + _commit_group(sales[middle:])
+
+
+class SaleGroupWriter:
+    """
+    Write-behind queue for single sales. Callers enqueue a sale and await its
+    future; one worker task takes whatever has queued up, waiting at most
+    `flush_interval` seconds or until `max_batch` sales are waiting, and
+    commits them together, so a burst of sales shares one commit and fsync.
+    A future resolves only once the transaction holding its sale committed.
+
+    The queue holds at most `depth` sales; further callers wait for room for
+    up to `enqueue_timeout` seconds before SaleQueueFullError is raised.
+    """
+
+    def __init__(
+        self,
+        max_batch: int,
+        flush_interval: float,
+        depth: int,
+        enqueue_timeout: float,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.depth = depth
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue | None = None
+        self._full: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the worker on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.depth)
+        self._full = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Commit what is still queued, then stop the worker."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+    async def submit(self, sale: dict) -> dict:
+        """
+        Queue `sale` and return its created row once committed.
+
+        :raises OutOfStockError: If the sale was rejected for lack of stock.
+        :raises ValueError: If the product does not exist.
+        :raises SaleQueueFullError: If the queue had no room in time.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(
+                self._queue.put((sale, future)), self.enqueue_timeout
+            )
+        except asyncio.TimeoutError:
+            raise SaleQueueFullError("Sale queue is full, retry later")
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _next_group(self) -> list:
+        group = [await self._queue.get()]
+        if self._queue.qsize() < self.max_batch - 1:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+        self._full.clear()
+        while len(group) < self.max_batch and not self._queue.empty():
+            group.append(self._queue.get_nowait())
+        return group
+
+    async def _run(self):
+        while True:
+            group = await self._next_group()
+            try:
+                results = await run_in_threadpool(
+                    _commit_group, [sale for sale, _ in group]
+                )
+            except Exception as exc:
+                # _commit_group resolves every sale itself; this is a bug
+                # or the loop shutting down, which no retry would get past
+                results = [exc] * len(group)
+            for (_, future), result in zip(group, results):
+                # The caller may have gone away while its group was written
+                if not future.done():
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+                self._queue.task_done()
+
+
+sale_writer = SaleGroupWriter(
+    settings.SALES_GROUP_COMMIT_MAX_BATCH,
+    settings.SALES_GROUP_COMMIT_INTERVAL_MS / 1000,
+    settings.SALES_GROUP_COMMIT_QUEUE_DEPTH,
+    settings.SALES_GROUP_COMMIT_ENQUEUE_TIMEOUT,
+)
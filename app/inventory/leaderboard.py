@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import threading
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.baselayer.basemodel import utc_now
+from app.inventory.enums import LeaderboardMetric, LeaderboardPeriod
+from app.inventory.models import DailyRevenue, Product
+from app.inventory.revenue_cache import period_start
+from config.config import settings
+from config.database import session_scope
+from config.logging_utils import logger
+
+
+class TopN:
+    """
+    The `size` largest of a set of counters that only ever grow, kept as a
+    min-heap of (value, key) so the smallest member can be displaced in
+    O(log size) when another counter overtakes it.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._heap: list[tuple[float, int]] = []
+        self._members: dict[int, float] = {}
+
+    def offer(self, key: int, value: float):
+        """Report the new value of counter `key`, which can only have grown."""
+        if key in self._members:
+            index = self._heap.index((self._members[key], key))
+            self._heap[index] = (value, key)
+            self._members[key] = value
+            # A grown member may now sit above larger ones; restore the order
+            heapq.heapify(self._heap)
+        elif len(self._heap) < self.size:
+            self._members[key] = value
+            heapq.heappush(self._heap, (value, key))
+        elif value > self._heap[0][0]:
+            _, evicted = heapq.heapreplace(self._heap, (value, key))
+            del self._members[evicted]
+            self._members[key] = value
+
+    def ranked(self, limit: int) -> list[int]:
+        """Member keys, largest value first."""
+        return [key for _, key in heapq.nlargest(limit, self._heap)]
+
+
+class Board:
+    """Counters and top-N heaps of one period bucket (e.g. one day)."""
+
+    def __init__(self, start: date, size: int):
+        self.start = start
+        self.size = size
+        # product_id -> [revenue, quantity]
+        self.totals: dict[int, list] = {}
+        # (metric, category or None) -> TopN
+        self.tops: dict[tuple, TopN] = {}
+
+    def add(self, product_id: int, category: str, revenue: float, quantity: int):
+        totals = self.totals.setdefault(product_id, [0.0, 0])
+        totals[0] += revenue
+        totals[1] += quantity
+        for metric, value in (
+            (LeaderboardMetric.REVENUE, totals[0]),
+            (LeaderboardMetric.QUANTITY, totals[1]),
+        ):
+            for scope in (None, category):
+                top = self.tops.get((metric, scope))
+                if top is None:
+                    top = self.tops[(metric, scope)] = TopN(self.size)
+                top.offer(product_id, value)
+
+
+class Leaderboard:
+    """
+    Per-process top sellers of the current day and week by revenue and by
+    quantity, overall and per category.
+
+    Sales recorded by this process are added as they commit; `rebuild` reloads
+    both buckets from the daily_revenue rollup, which also picks up sales other
+    workers recorded. Running it periodically bounds the drift between workers
+    to the reconcile interval. Sales this process records while a rebuild is
+    querying may be missed by it, until the next one.
+    """
+
+    PERIODS = (LeaderboardPeriod.DAILY, LeaderboardPeriod.WEEKLY)
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._boards: dict[LeaderboardPeriod, Board] = {}
+        self._products: dict[int, tuple[str, str]] = {}
+        self.reconciled_at: datetime | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.reconciled_at is not None
+
+    def _board(self, period: LeaderboardPeriod, today: date) -> Board:
+        # Caller holds the lock. A new day or week starts from an empty board.
+        start = period_start(period.value, today)
+        board = self._boards.get(period)
+        if board is None or board.start != start:
+            board = self._boards[period] = Board(start, self.size)
+        return board
+
+    def unnamed(self, product_ids) -> set[int]:
+        """Those of `product_ids` the leaderboard has no name for yet."""
+        with self._lock:
+            return {
+                product_id
+                for product_id in product_ids
+                if self._products.get(product_id, (None,))[0] is None
+            }
+
+    def record_sale(
+        self,
+        product_id: int,
+        name: str | None,
+        category: str,
+        sale_date: date,
+        revenue: float,
+        quantity: int,
+    ):
+        """
+        Add committed sales to the buckets of `sale_date`, if they are current.
+        `name` is only needed for products `unnamed` reports.
+        """
+        if category is None:
+            # Not a catalog product; it could not be ranked or named
+            return
+        today = date.today()
+        with self._lock:
+            if name is not None:
+                self._products[product_id] = (name, category)
+            else:
+                self._products.setdefault(product_id, (None, category))
+            for period in self.PERIODS:
+                board = self._board(period, today)
+                if board.start <= sale_date <= today:
+                    board.add(product_id, category, revenue, quantity)
+
+    def rebuild(self, db: Session):
+        """Replace both buckets with what the daily_revenue rollup holds."""
+        today = date.today()
+        boards = {
+            period: Board(period_start(period.value, today), self.size)
+            for period in self.PERIODS
+        }
+        first_day = min(board.start for board in boards.values())
+        rows = db.execute(
+            select(
+                DailyRevenue.day,
+                DailyRevenue.product_id,
+                DailyRevenue.category,
+                DailyRevenue.total_revenue,
+                DailyRevenue.total_quantity,
+                Product.name,
+            )
+            .join(Product, Product.id == DailyRevenue.product_id)
+            .where(DailyRevenue.day.between(first_day, today))
+        ).all()
+
+        products = {}
+        for day, product_id, category, revenue, quantity, name in rows:
+            products[product_id] = (name, category)
+            for board in boards.values():
+                if day >= board.start:
+                    board.add(product_id, category, revenue, quantity)
+
+        with self._lock:
+            self._boards = boards
+            self._products.update(products)
+            self.reconciled_at = utc_now()
+
+    def top(
+        self,
+        period: LeaderboardPeriod,
+        metric: LeaderboardMetric,
+        category: str | None,
+        limit: int,
+    ) -> dict:
+        today = date.today()
+        with self._lock:
+            board = self._board(period, today)
+            top = board.tops.get((metric, category))
+            ranked = top.ranked(limit) if top else []
+            items = [
+                {
+                    "product_id": product_id,
+                    "product_name": self._products[product_id][0],
+                    "category": self._products[product_id][1],
+                    "total_revenue": board.totals[product_id][0],
+                    "total_quantity": board.totals[product_id][1],
+                }
+                for product_id in ranked
+            ]
+            return {
+                "period": period,
+                "metric": metric,
+                "category": category,
+                "start_date": board.start,
+                "end_date": today,
+                "reconciled_at": self.reconciled_at,
+                "items": items,
+            }
+
+
+leaderboard = Leaderboard(settings.LEADERBOARD_SIZE)
+
+
+def record_leaderboard_sales(db: Session, buckets):
+    """
+    Add committed sales, as (sale_date, product_id, category, revenue,
+    quantity) tuples, to this process's leaderboard, looking up the names of
+    products it has not seen since its last rebuild.
+    """
+    if not settings.LEADERBOARD_ENABLED:
+        return
+    buckets = list(buckets)
+    unnamed = leaderboard.unnamed(
+        product_id for _, product_id, category, _, _ in buckets if category
+    )
+    names = {}
+    if unnamed:
+        names = dict(
+            db.execute(
+                select(Product.id, Product.name).where(Product.id.in_(unnamed))
+            ).all()
+        )
+    for sale_date, product_id, category, revenue, quantity in buckets:
+        leaderboard.record_sale(
+            product_id, names.get(product_id), category, sale_date, revenue, quantity
+        )
+
+
+def rebuild_leaderboard():
+    with session_scope() as db:
+        leaderboard.rebuild(db)
+
+
+async def reconcile_leaderboard():
+    """Rebuild the leaderboard every LEADERBOARD_RECONCILE_SECONDS, for ever."""
+    while True:
+        try:
+            await run_in_threadpool(rebuild_leaderboard)
+        except Exception as exc:
+            logger.error(
+                {
+                    "method": "reconcile_leaderboard",
+                    "message": "Leaderboard rebuild failed",
+                    "error": str(exc),
+                }
+            )
+        await asyncio.sleep(settings.LEADERBOARD_RECONCILE_SECONDS)
@@ -0,0 +1,51 @@
+from functools import partial
+from typing import Iterable
+
+from app.baselayer.events import InMemoryEventBroker, RedisEventBroker
+from config.config import settings
+from config.database import run_blocking
+
+LOW_STOCK_CHANNEL = "low-stock"
+
+
+def _build_broker():
+    if settings.LOW_STOCK_EVENT_BACKEND == "redis":
+        return RedisEventBroker(settings.REDIS_URL, settings.LOW_STOCK_EVENT_QUEUE_SIZE)
+    return InMemoryEventBroker(settings.LOW_STOCK_EVENT_QUEUE_SIZE)
+
+
+low_stock_events = _build_broker()
+
+
+def low_stock_transition(old_quantity: int, new_quantity: int) -> str | None:
+    """Name of the threshold crossing between two stock levels, if any."""
+    threshold = settings.LOW_STOCK_THRESHOLD
+    if old_quantity >= threshold > new_quantity:
+        return "low_stock"
+    if new_quantity >= threshold > old_quantity:
+        return "restocked"
+    return None
+
+
+def publish_low_stock_transitions(changes: Iterable[tuple[int, int, int]]):
+    """
+    Publish an event for every (product_id, old_quantity, new_quantity) change
+    that crosses LOW_STOCK_THRESHOLD; call after the change is committed.
+    """
+    publish = low_stock_events.publish
+    if low_stock_events.blocking:
+        # Kept off the event loop when called from an async route's service
+        publish = partial(run_blocking, publish)
+    for product_id, old_quantity, new_quantity in changes:
+        transition = low_stock_transition(old_quantity, new_quantity)
+        if transition:
+            publish(
+                LOW_STOCK_CHANNEL,
+                {
+                    "event": transition,
+                    "product_id": product_id,
+                    "old_quantity": old_quantity,
+                    "new_quantity": new_quantity,
+                    "threshold": settings.LOW_STOCK_THRESHOLD,
+                },
+            )
@@ -1,30 +1,47 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
 
 from app.baselayer.basemodel import BaseModel
+from config.database import Base
+
+# Hot indexes only cover live rows. Queries get the predicate from the
+# soft-delete criteria in app.baselayer.basemodel, which SQLite spells `= 0`
+LIVE_ROWS = {'postgresql_where': text('is_deleted = false'), 'sqlite_where': text('is_deleted = 0')}
 
 
 class Product(BaseModel):
     __tablename__ = "products"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     category = Column(String(100), nullable=False)
     price = Column(Float, nullable=False)
     sales = relationship('Sale', back_populates='product', cascade='all, delete-orphan')
     inventory = relationship('Inventory', uselist=False, back_populates='product', cascade='all, delete-orphan')
 
+    __table_args__ = (Index('ix_products_category', 'category', **LIVE_ROWS),)
+
 
 class Sale(BaseModel):
     __tablename__ = "sales"
 
-    id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey('products.id'), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
     quantity = Column(Integer, nullable=False)
-    sale_date = Column(Date, nullable=False, index=True)
+    sale_date = Column(Date, nullable=False)
     total_price = Column(Float, nullable=False)
     product = relationship('Product', back_populates='sales')
 
+    __table_args__ = (
+        # Product sales over a date range, answered from the index alone for revenue sums
+        Index('ix_sales_product_id_sale_date', 'product_id', 'sale_date',
+              postgresql_include=['quantity', 'total_price'], **LIVE_ROWS),
+        # Keyset pagination order of GET /sales
+        Index('ix_sales_sale_date_id', 'sale_date', 'id', **LIVE_ROWS),
+        # Range partitioned by month on Postgres, see app.inventory.partitions
+        {'info': {'partition_by': 'sale_date'}},
+    )
+
 
 class Inventory(BaseModel):
     __tablename__ = "inventory"
@@ -36,14 +53,68 @@ class Inventory(BaseModel):
     product = relationship('Product', back_populates='inventory')
     history = relationship('InventoryHistory', back_populates='inventory', cascade='all, delete-orphan')
 
+    # Low-stock pages, lowest stock first
+    __table_args__ = (Index('ix_inventory_current_quantity_product_id', 'current_quantity', 'product_id', **LIVE_ROWS),)
+
 
 class InventoryHistory(BaseModel):
     __tablename__ = "inventory_history"
 
-    id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey('inventory.product_id'), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('inventory.product_id'), nullable=False)
     old_quantity = Column(Integer, nullable=False)
     new_quantity = Column(Integer, nullable=False)
     change_date = Column(DateTime, server_default=func.now(), nullable=False)
 
     inventory = relationship('Inventory', back_populates='history')
+
+    # Range partitioned by month on Postgres, see app.inventory.partitions
+    __table_args__ = ({'info': {'partition_by': 'change_date'}},)
+
+
+# Per-product history window, newest first
+Index('ix_inventory_history_product_id_change_date',
+      InventoryHistory.product_id, InventoryHistory.change_date.desc(), **LIVE_ROWS)
+
+
+class InventoryHistoryDaily(Base):
+    """Per-day, per-product summary of inventory_history rows older than the raw window."""
+
+    __tablename__ = "inventory_history_daily"
+
+    product_id = Column(Integer, ForeignKey('inventory.product_id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    open_quantity = Column(Integer, nullable=False)
+    close_quantity = Column(Integer, nullable=False)
+    min_quantity = Column(Integer, nullable=False)
+    max_quantity = Column(Integer, nullable=False)
+    change_count = Column(Integer, nullable=False)
+
+
+class DailyRevenue(Base):
+    """Per-day, per-product revenue rollup maintained alongside `sales` writes."""
+
+    __tablename__ = "daily_revenue"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    total_revenue = Column(Float, nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    sale_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index('ix_daily_revenue_category_day', 'category', 'day'),)
+
+
+class DataVersion(Base):
+    """
+    Write counters of the data behind ETags, one column per dataset, spread
+    over a few rows so concurrent writers rarely bump the same one. See
+    app.inventory.data_versions.
+    """
+
+    __tablename__ = "data_versions"
+
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    inventory = Column(BigInteger, nullable=False, default=0)
+    sales = Column(BigInteger, nullable=False, default=0)
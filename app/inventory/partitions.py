@@ -0,0 +1,170 @@
+import argparse
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.baselayer.dialect import dialect_name
+from app.inventory.models import InventoryHistory, Sale
+from config.config import settings
+from config.database import session_scope
+from config.logging_utils import logger
+
+# Tables that are range partitioned by month on Postgres, declared on the models
+PARTITIONED_TABLES = {
+    model.__table__.name: model.__table__.info["partition_by"]
+    for model in (Sale, InventoryHistory)
+}
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def ensure_month_partition(db: Session, table: str, month: date) -> bool:
+    """
+    Create the partition of `table` holding `month` unless it already exists,
+    moving any rows for that month out of the default partition first.
+    Returns whether a partition was created.
+    """
+    name = partition_name(table, month)
+    exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return False
+
+    column = PARTITIONED_TABLES[table]
+    bounds = {"start": month, "end": add_months(month, 1)}
+    default = f"{table}_default"
+    stray_rows = db.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {default} "
+            f"WHERE {column} >= :start AND {column} < :end)"
+        ),
+        bounds,
+    ).scalar()
+
+    # Bounds are rendered inline; DDL does not accept bind parameters
+    create = (
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    )
+    if stray_rows:
+        # Postgres refuses to add a partition whose range has rows in the
+        # default partition; take the default out while moving them over
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        db.execute(text(create))
+        db.execute(
+            text(
+                f"INSERT INTO {name} SELECT * FROM {default} "
+                f"WHERE {column} >= :start AND {column} < :end"
+            ),
+            bounds,
+        )
+        db.execute(
+            text(f"DELETE FROM {default} WHERE {column} >= :start AND {column} < :end"),
+            bounds,
+        )
+        db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    else:
+        db.execute(text(create))
+    return True
+
+
+def ensure_partitions(db: Session, months_ahead: int | None = None) -> list[str]:
+    """
+    Pre-create monthly partitions from the current month up to `months_ahead`
+    months ahead for every partitioned table. No-op on databases other than Postgres.
+    """
+    if dialect_name(db) != "postgresql":
+        return []
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+
+    created = []
+    current = month_start(date.today())
+    for table in PARTITIONED_TABLES:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if ensure_month_partition(db, table, month):
+                created.append(partition_name(table, month))
+    db.commit()
+    return created
+
+
+def detach_partitions_before(
+    db: Session, table: str, before: date, drop: bool = False
+) -> list[str]:
+    """
+    Detach (and optionally drop) every monthly partition of `table` that ends on
+    or before `before`, retiring old data without a large DELETE.
+    """
+    if dialect_name(db) != "postgresql":
+        return []
+    partitions = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table AND child.relname LIKE :pattern"
+        ),
+        {"table": table, "pattern": f"{table}_y%m%"},
+    ).scalars()
+
+    retired = []
+    for name in sorted(partitions):
+        year, month = name.rsplit("_y", 1)[1].split("m")
+        if add_months(date(int(year), int(month), 1), 1) > before:
+            continue
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        retired.append(name)
+    db.commit()
+    return retired
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain monthly partitions of sales and inventory_history."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Pre-create upcoming partitions")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    detach = commands.add_parser("detach", help="Retire partitions of old months")
+    detach.add_argument("--table", choices=sorted(PARTITIONED_TABLES), required=True)
+    detach.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        required=True,
+        help="Retire months that end on or before this date",
+    )
+    detach.add_argument("--drop", action="store_true", help="Drop after detaching")
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        if args.command == "ensure":
+            partitions = ensure_partitions(db, args.months_ahead)
+        else:
+            partitions = detach_partitions_before(
+                db, args.table, args.before, args.drop
+            )
+    logger.info(
+        {
+            "method": f"partitions_{args.command}",
+            "message": "Partition maintenance finished",
+            "partitions": partitions,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
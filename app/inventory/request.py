@@ -1,7 +1,9 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from config.config import settings
 
 
 class SaleBase(BaseModel):
@@ -15,6 +17,12 @@ class SaleCreate(SaleBase):
     pass
 
 
+class SaleBulkCreate(BaseModel):
+    sales: List[SaleCreate] = Field(
+        ..., min_length=1, max_length=settings.SALES_BULK_MAX_ITEMS
+    )
+
+
 class InventoryBase(BaseModel):
     current_quantity: int = Field(..., ge=0)
 
@@ -23,11 +31,33 @@ class InventoryUpdate(InventoryBase):
     pass
 
 
+class InventoryQuantity(BaseModel):
+    product_id: int
+    new_quantity: int = Field(..., ge=0)
+
+
+class InventoryBulkUpdate(BaseModel):
+    items: List[InventoryQuantity] = Field(
+        ..., min_length=1, max_length=settings.INVENTORY_BULK_MAX_ITEMS
+    )
+
+
+class RevenuePeriod(BaseModel):
+    start_date: date
+    end_date: date
+    label: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date")
+        return self
+
+
 class RevenueComparison(BaseModel):
-    period1_start: date
-    period1_end: date
-    period2_start: date
-    period2_end: date
+    periods: List[RevenuePeriod] = Field(
+        ..., min_length=2, max_length=settings.REVENUE_COMPARISON_MAX_PERIODS
+    )
     category: Optional[str] = None
 
 
@@ -38,6 +68,33 @@ class SalesFilter(BaseModel):
     category: Optional[str] = None
 
 
+class InventoryHistoryFilter(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    product_id: Optional[int] = None
+
+
+class SalesPagination(BaseModel):
+    limit: int = Field(100, ge=1, le=settings.SALES_PAGE_MAX_LIMIT)
+    cursor: Optional[str] = None
+
+
+class InventoryPagination(BaseModel):
+    limit: int = Field(100, ge=1, le=settings.INVENTORY_PAGE_MAX_LIMIT)
+    cursor: Optional[str] = None
+
+
+class ForecastParams(BaseModel):
+    # Days of sales, up to and including today, the velocities are computed from
+    history_days: int = Field(90, ge=1, le=settings.FORECAST_MAX_HISTORY_DAYS)
+    # Days averaged by the moving-average velocity
+    window: int = Field(7, ge=1, le=settings.FORECAST_MAX_HISTORY_DAYS)
+    # Smoothing factor of the exponentially weighted velocity
+    alpha: float = Field(0.2, gt=0, le=1)
+    category: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1)
+
+
 class InventoryResponse(InventoryBase):
     product_id: int
     product_name: str
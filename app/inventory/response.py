@@ -1,7 +1,10 @@
 from datetime import date, datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.inventory.enums import LeaderboardMetric, LeaderboardPeriod
+
 
 class SaleBase(BaseModel):
     product_id: int
@@ -17,10 +20,99 @@ class SaleResponse(SaleBase):
         orm_mode = True
 
 
+class SaleBulkError(BaseModel):
+    index: int
+    product_id: int
+    error: str
+
+
+class SaleBulkResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[SaleBulkError]
+
+
+class SalePageResponse(BaseModel):
+    items: List[SaleResponse]
+    next_cursor: Optional[str] = None
+
+
+class InventoryChange(BaseModel):
+    product_id: int
+    old_quantity: int
+    new_quantity: int
+
+
+class InventoryBulkError(BaseModel):
+    index: int
+    product_id: int
+    error: str
+
+
+class InventoryBulkResponse(BaseModel):
+    updated: int
+    failed: int
+    items: List[InventoryChange]
+    errors: List[InventoryBulkError]
+
+
 class InventoryHistoryResponse(BaseModel):
     old_quantity: int
     new_quantity: int
     change_date: datetime
+    # Set on entries that summarize a whole compacted day: old/new_quantity
+    # are then the day's opening and closing stock
+    compacted: bool = False
+    change_count: int = 1
+    min_quantity: Optional[int] = None
+    max_quantity: Optional[int] = None
 
     class Config:
         orm_mode = True
+
+
+class StockForecast(BaseModel):
+    product_id: int
+    current_quantity: int
+    moving_average_velocity: float
+    ewma_velocity: float
+    days_until_stockout: Optional[float] = None
+    stockout_date: Optional[date] = None
+
+
+class TopSeller(BaseModel):
+    product_id: int
+    product_name: Optional[str] = None
+    category: str
+    total_revenue: float
+    total_quantity: int
+
+
+class TopSellersResponse(BaseModel):
+    period: LeaderboardPeriod
+    metric: LeaderboardMetric
+    category: Optional[str] = None
+    start_date: date
+    end_date: date
+    # When the counters were last rebuilt from the database
+    reconciled_at: Optional[datetime] = None
+    items: List[TopSeller]
+
+
+class RevenuePeriodTotal(BaseModel):
+    label: str
+    start_date: date
+    end_date: date
+    total_revenue: float
+
+
+class RevenuePeriodChange(BaseModel):
+    base: str
+    compare: str
+    difference: float
+    percentage_change: float
+
+
+class RevenueComparisonResponse(BaseModel):
+    periods: List[RevenuePeriodTotal]
+    comparisons: List[RevenuePeriodChange]
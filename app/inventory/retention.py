@@ -0,0 +1,192 @@
+import argparse
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, delete, select, true
+from sqlalchemy.orm import Session
+
+from app.baselayer.dialect import upsert_insert
+from app.inventory.models import InventoryHistory, InventoryHistoryDaily
+from config.config import settings
+from config.database import session_scope
+from config.logging_utils import logger
+
+
+def raw_history_cutoff(raw_days: int | None = None) -> datetime:
+    """
+    Start of the raw inventory_history window: midnight `raw_days` days ago.
+    Older changes only exist as daily summaries once compaction has run.
+    """
+    if raw_days is None:
+        raw_days = settings.INVENTORY_HISTORY_RAW_DAYS
+    return datetime.combine(date.today() - timedelta(days=raw_days), time.min)
+
+
+def _summarize(rows) -> list[dict]:
+    """
+    Fold history rows, ordered newest first per product, into one summary per
+    product and day.
+    """
+    summaries = {}
+    for row in rows:
+        key = (row.product_id, row.change_date.date())
+        summary = summaries.get(key)
+        if summary is None:
+            summaries[key] = {
+                "product_id": row.product_id,
+                "day": key[1],
+                "open_quantity": row.old_quantity,
+                "close_quantity": row.new_quantity,
+                "min_quantity": min(row.old_quantity, row.new_quantity),
+                "max_quantity": max(row.old_quantity, row.new_quantity),
+                "change_count": 1,
+            }
+            continue
+        # Rows come newest first, so each one opens the day earlier
+        summary["open_quantity"] = row.old_quantity
+        summary["min_quantity"] = min(
+            summary["min_quantity"], row.old_quantity, row.new_quantity
+        )
+        summary["max_quantity"] = max(
+            summary["max_quantity"], row.old_quantity, row.new_quantity
+        )
+        summary["change_count"] += 1
+    return list(summaries.values())
+
+
+def _merge_summaries(db: Session, summaries: list[dict]):
+    """
+    Upsert daily summaries. A batch always holds changes older than those
+    already summarized for the same day, so it replaces the opening quantity
+    and keeps the closing one.
+    """
+    table = InventoryHistoryDaily.__table__
+    stmt = upsert_insert(db, table).values(summaries)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.product_id, table.c.day],
+        set_={
+            "open_quantity": excluded.open_quantity,
+            "min_quantity": case(
+                (excluded.min_quantity < table.c.min_quantity, excluded.min_quantity),
+                else_=table.c.min_quantity,
+            ),
+            "max_quantity": case(
+                (excluded.max_quantity > table.c.max_quantity, excluded.max_quantity),
+                else_=table.c.max_quantity,
+            ),
+            "change_count": table.c.change_count + excluded.change_count,
+        },
+    )
+    db.execute(stmt)
+
+
+def compact_inventory_history(
+    db: Session, raw_days: int | None = None, batch_size: int | None = None
+) -> dict:
+    """
+    Fold inventory_history rows older than the raw window into
+    inventory_history_daily and delete them, `batch_size` rows per transaction
+    so locks and WAL stay bounded and the job can be stopped at any point.
+    Each batch's summaries and deletes commit together, so an interrupted run
+    neither loses nor double counts changes.
+
+    Rows are walked per product, newest first, which is the order of
+    ix_inventory_history_product_id_change_date. Soft-deleted rows, which
+    that index and the walk leave out, are deleted without being summarized.
+    """
+    if batch_size is None:
+        batch_size = settings.INVENTORY_HISTORY_COMPACT_BATCH_SIZE
+    cutoff = raw_history_cutoff(raw_days)
+
+    compacted = batches = 0
+    last_product_id = None
+    while True:
+        query = (
+            select(
+                InventoryHistory.id,
+                InventoryHistory.product_id,
+                InventoryHistory.old_quantity,
+                InventoryHistory.new_quantity,
+                InventoryHistory.change_date,
+            )
+            .where(InventoryHistory.change_date < cutoff)
+            .order_by(
+                InventoryHistory.product_id,
+                InventoryHistory.change_date.desc(),
+                InventoryHistory.id.desc(),
+            )
+            .limit(batch_size)
+        )
+        if last_product_id is not None:
+            # Products before the last one are done; skip their index entries
+            query = query.where(InventoryHistory.product_id >= last_product_id)
+        rows = db.execute(query).all()
+        if not rows:
+            break
+
+        _merge_summaries(db, _summarize(rows))
+        # The change_date bounds let Postgres prune partitions and use the
+        # (id, change_date) primary key of each one
+        db.execute(
+            delete(InventoryHistory).where(
+                InventoryHistory.id.in_([row.id for row in rows]),
+                InventoryHistory.change_date >= min(row.change_date for row in rows),
+                InventoryHistory.change_date <= max(row.change_date for row in rows),
+            )
+        )
+        db.commit()
+
+        compacted += len(rows)
+        batches += 1
+        last_product_id = rows[-1].product_id
+
+    purged = 0
+    while True:
+        # A DELETE is not an ORM select, so it reaches soft-deleted rows
+        ids = (
+            select(InventoryHistory.id)
+            .where(
+                InventoryHistory.is_deleted == true(),
+                InventoryHistory.change_date < cutoff,
+            )
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(InventoryHistory).where(
+                InventoryHistory.id.in_(ids), InventoryHistory.change_date < cutoff
+            )
+        )
+        db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return {
+        "cutoff": cutoff.isoformat(),
+        "compacted": compacted,
+        "purged": purged,
+        "batches": batches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact inventory_history older than the raw window into daily summaries."
+    )
+    # The raw window always comes from INVENTORY_HISTORY_RAW_DAYS, which
+    # get_inventory_history also reads to decide whether to merge summaries
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        result = compact_inventory_history(db, batch_size=args.batch_size)
+    logger.info(
+        {
+            "method": "compact_inventory_history",
+            "message": "Inventory history compacted",
+            **result,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from app.baselayer.cache import CacheScope, InMemoryLRUCache, RedisCache
+from config.config import settings
+from config.database import run_blocking
+
+
+def _build_backend():
+    if settings.REVENUE_CACHE_BACKEND == "redis":
+        return RedisCache(settings.REDIS_URL, prefix="revenue-cache")
+    return InMemoryLRUCache(settings.REVENUE_CACHE_MAX_ENTRIES)
+
+
+revenue_cache = _build_backend()
+
+
+def _call(method, *args, **kwargs):
+    """Call a `revenue_cache` method, off the event loop if it does I/O."""
+    if revenue_cache.blocking:
+        return run_blocking(method, *args, **kwargs)
+    return method(*args, **kwargs)
+
+
+def period_start(period: str, day: date) -> date:
+    """Return the first day of the `period` bucket that contains `day`."""
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def scope_ttl(scope: CacheScope) -> float:
+    """
+    Spans that end before today only change through back-dated writes, which
+    invalidate them explicitly, so they use the longer history TTL. It still
+    expires them, as invalidation only reaches the `memory` cache of the
+    process that made the write.
+    """
+    if scope.end is not None and scope.end < date.today():
+        return settings.REVENUE_CACHE_HISTORY_TTL
+    return settings.REVENUE_CACHE_TTL
+
+
+def cached(
+    key: tuple, scope: CacheScope, compute: Callable, max_ttl: Optional[float] = None
+):
+    """
+    Return the cached value for `key`, computing and storing it on a miss.
+    `max_ttl` caps how long the computed value is kept.
+    """
+    found, value = _call(revenue_cache.get, key)
+    if found:
+        return value
+    generation = _call(revenue_cache.generation)
+    value = compute()
+    ttl = scope_ttl(scope)
+    if max_ttl is not None:
+        ttl = min(ttl, max_ttl) if ttl else max_ttl
+    _call(revenue_cache.set, key, value, scope, ttl, generation=generation)
+    return value
+
+
+def clear_revenue():
+    """Drop every cached revenue result."""
+    _call(revenue_cache.clear)
+
+
+def invalidate_revenue(day: date, category: Optional[str] = None):
+    """Drop cached revenue results that a sale on `day` in `category` affects."""
+    if settings.REVENUE_CACHE_ENABLED:
+        _call(revenue_cache.invalidate, day, category)
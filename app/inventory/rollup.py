@@ -0,0 +1,249 @@
+import argparse
+from datetime import date
+
+from sqlalchemy import (
+    Date,
+    Float,
+    Integer,
+    event,
+    false,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from app.baselayer.basemodel import INCLUDE_DELETED
+from app.baselayer.dialect import dialect_name, upsert_insert
+from app.inventory.data_versions import SALES, bump_versions
+from app.inventory.models import DailyRevenue, Product, Sale
+from app.inventory.revenue_cache import clear_revenue, invalidate_revenue
+from config.database import session_scope
+from config.logging_utils import logger
+
+PERIOD_FORMATS = {
+    "postgresql": {
+        "daily": "YYYY-MM-DD",
+        "weekly": "IYYY-IW",
+        "monthly": "YYYY-MM",
+        "annual": "YYYY",
+    },
+    "sqlite": {
+        "daily": "%Y-%m-%d",
+        "monthly": "%Y-%m",
+        "annual": "%Y",
+    },
+}
+
+ROLLUP_COLUMNS = [
+    "day",
+    "product_id",
+    "category",
+    "total_revenue",
+    "total_quantity",
+    "sale_count",
+]
+
+
+def period_bucket(db: Session, period: str, column):
+    """
+    Return a SQL expression formatting a date column into its period bucket label.
+
+    The format is rendered inline rather than bound so the same expression can be
+    repeated in GROUP BY / ORDER BY on Postgres.
+    """
+    name = dialect_name(db)
+    if name == "sqlite" and period == "weekly":
+        return _sqlite_iso_week(column)
+    fmt = PERIOD_FORMATS[name][period]
+    if name == "postgresql":
+        return func.to_char(column, literal_column(f"'{fmt}'"))
+    return func.strftime(literal_column(f"'{fmt}'"), column)
+
+
+def _sqlite_iso_week(column):
+    """
+    ISO year-week label (YYYY-WW), as Postgres' IYYY-IW gives, for SQLite,
+    whose strftime has no %G/%V before 3.46. An ISO week belongs to the year
+    of its Thursday, and is numbered by that Thursday's day of the year.
+    """
+    thursday = func.date(
+        column, literal_column("'-3 days'"), literal_column("'weekday 4'")
+    )
+    # %j is text; SQLite's arithmetic makes it an integer, and / truncates
+    week = (func.strftime(literal_column("'%j'"), thursday) + 6) / 7
+    return func.printf(
+        literal_column("'%s-%02d'"),
+        func.strftime(literal_column("'%Y'"), thursday),
+        week,
+    )
+
+
+def _add_on_conflict(stmt):
+    """Make an INSERT into daily_revenue add onto existing buckets."""
+    table = DailyRevenue.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.product_id, table.c.category],
+        set_={
+            "total_revenue": table.c.total_revenue + stmt.excluded.total_revenue,
+            "total_quantity": table.c.total_quantity + stmt.excluded.total_quantity,
+            "sale_count": table.c.sale_count + stmt.excluded.sale_count,
+        },
+    )
+
+
+def _upsert_rollup(db: Session, source):
+    """Insert aggregated rows from `source`, adding onto any existing buckets."""
+    stmt = upsert_insert(db, DailyRevenue.__table__).from_select(ROLLUP_COLUMNS, source)
+    return db.execute(_add_on_conflict(stmt))
+
+
+def record_revenue_buckets(db: Session, buckets: list[dict]):
+    """
+    Add pre-aggregated buckets (dicts keyed by ROLLUP_COLUMNS) to daily_revenue
+    with one multi-row upsert, inside the caller's transaction.
+    """
+    if not buckets:
+        return
+    stmt = upsert_insert(db, DailyRevenue.__table__).values(buckets)
+    db.execute(_add_on_conflict(stmt))
+
+
+def record_sale_revenue(
+    db: Session, product_id: int, sale_date: date, quantity: int, total_price: float
+):
+    """
+    Add a single sale to its daily_revenue bucket and return the product's
+    category, or None if there is no such (live) product. Runs inside the
+    caller's transaction so the rollup commits or rolls back together with
+    the sale.
+    """
+    source = select(
+        literal(sale_date, Date),
+        Product.id,
+        Product.category,
+        literal(total_price, Float),
+        literal(quantity, Integer),
+        literal(1, Integer),
+    ).where(Product.id == product_id, Product.is_deleted == false())
+    stmt = upsert_insert(db, DailyRevenue.__table__).from_select(ROLLUP_COLUMNS, source)
+    stmt = _add_on_conflict(stmt).returning(DailyRevenue.__table__.c.category)
+    return db.execute(stmt).scalar()
+
+
+# Session.info key of the (day, category) buckets a transaction's soft
+# deletes changed, invalidated in the revenue cache once it commits
+_CHANGED_BUCKETS = "revenue_buckets_changed"
+
+
+@event.listens_for(Session, "before_flush")
+def _reverse_deleted_sales(session, flush_context, instances):
+    """
+    Take soft-deleted sales out of their daily_revenue bucket, and put
+    restored ones back, in the flush that writes the flag, so the rollup
+    commits together with it.
+    """
+    for sale in session.dirty:
+        if not isinstance(sale, Sale):
+            continue
+        added, _, deleted = inspect(sale).attrs.is_deleted.history
+        if not added or not deleted or bool(added[0]) == bool(deleted[0]):
+            continue
+        sign = -1 if added[0] else 1
+        category = session.execute(
+            select(Product.category).where(Product.id == sale.product_id),
+            execution_options={INCLUDE_DELETED: True},
+        ).scalar()
+        record_revenue_buckets(
+            session,
+            [
+                {
+                    "day": sale.sale_date,
+                    "product_id": sale.product_id,
+                    "category": category,
+                    "total_revenue": sign * sale.total_price,
+                    "total_quantity": sign * sale.quantity,
+                    "sale_count": sign,
+                }
+            ],
+        )
+        bump_versions(session, SALES)
+        session.info.setdefault(_CHANGED_BUCKETS, set()).add((sale.sale_date, category))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_buckets(session):
+    for day, category in session.info.pop(_CHANGED_BUCKETS, ()):
+        invalidate_revenue(day, category)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_buckets(session):
+    session.info.pop(_CHANGED_BUCKETS, None)
+
+
+def rebuild_daily_revenue(
+    db: Session, start_date: date | None = None, end_date: date | None = None
+) -> int:
+    """
+    Recompute daily_revenue from the raw sales table for the given date range
+    (or the whole history) and return the number of rollup rows written.
+    """
+    stale = db.query(DailyRevenue)
+    source = (
+        select(
+            Sale.sale_date,
+            Sale.product_id,
+            Product.category,
+            func.sum(Sale.total_price),
+            func.sum(Sale.quantity),
+            func.count(Sale.id),
+        )
+        .join(Product, Product.id == Sale.product_id)
+        # INSERT ... SELECT is not an ORM select, so soft-deleted sales are
+        # filtered here; this also gives SQLite the WHERE clause it needs to
+        # parse INSERT ... SELECT ... ON CONFLICT
+        .where(Sale.is_deleted == false())
+        .group_by(Sale.sale_date, Sale.product_id, Product.category)
+    )
+    if start_date:
+        stale = stale.filter(DailyRevenue.day >= start_date)
+        source = source.where(Sale.sale_date >= start_date)
+    if end_date:
+        stale = stale.filter(DailyRevenue.day <= end_date)
+        source = source.where(Sale.sale_date <= end_date)
+
+    stale.delete(synchronize_session=False)
+    result = _upsert_rollup(db, source)
+    bump_versions(db, SALES)
+    db.commit()
+    # A rebuild can touch any cached span; start over rather than track which
+    clear_revenue()
+    return result.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill or rebuild the daily_revenue rollup from sales."
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        rows = rebuild_daily_revenue(db, args.start_date, args.end_date)
+    logger.info(
+        {
+            "method": "rebuild_daily_revenue",
+            "message": "Daily revenue rollup rebuilt",
+            "start_date": str(args.start_date),
+            "end_date": str(args.end_date),
+            "rows": rows,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
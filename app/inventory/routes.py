@@ -1,73 +1,365 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import orjson
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.baselayer.baseview import FastResponder
+from app.inventory.data_versions import INVENTORY, SALES
+from app.inventory.enums import ExportFormat, LeaderboardMetric, LeaderboardPeriod
+from app.inventory.exceptions import OutOfStockError, SaleQueueFullError
+from app.inventory.forecast import forecast_stockouts, numpy_available
+from app.inventory.group_commit import sale_writer
+from app.inventory.leaderboard import leaderboard, rebuild_leaderboard
+from app.inventory.low_stock import LOW_STOCK_CHANNEL, low_stock_events
 from app.inventory.request import (
     SaleCreate,
+    SaleBulkCreate,
     SalesFilter,
+    SalesPagination,
+    InventoryHistoryFilter,
+    InventoryBulkUpdate,
+    InventoryPagination,
+    ForecastParams,
     RevenueAnalysis,
     RevenueComparison,
     InventoryResponse,
 )
-from app.inventory.response import SaleResponse, InventoryHistoryResponse
+from app.inventory.response import (
+    SaleResponse,
+    SaleBulkResponse,
+    SalePageResponse,
+    InventoryHistoryResponse,
+    InventoryBulkResponse,
+    StockForecast,
+    TopSellersResponse,
+    RevenueComparisonResponse,
+)
 from app.inventory.services import (
     create_sale,
+    create_sales_bulk,
     get_sales,
-    analyze_revenue,
-    compare_revenue,
+    stream_sales,
+    export_sales,
+    export_inventory_history,
+    SALES_EXPORT_COLUMNS,
+    INVENTORY_HISTORY_EXPORT_COLUMNS,
+    cached_analyze_revenue,
+    cached_compare_revenue,
     get_inventory,
+    get_low_stock_inventory,
     update_inventory,
+    update_inventory_bulk,
     get_inventory_history,
 )
-from config.database import get_db
+from app.inventory.utils.conditional import conditional_response, set_etag
+from app.middleware.read_your_writes import read_only
+from app.inventory.utils.export import (
+    FILE_EXTENSIONS,
+    MEDIA_TYPES,
+    iter_export,
+    pyarrow_available,
+)
+from config.config import settings
+from config.database import (
+    AnySession,
+    get_read_session,
+    get_session,
+    run_db,
+    session_scope,
+)
 
 router = APIRouter()
 
 
 @router.post("/sales", response_model=SaleResponse)
-def create_sale_endpoint(sale_data: SaleCreate, db: Session = Depends(get_db)):
+async def create_sale_endpoint(
+    sale_data: SaleCreate, db: AnySession = Depends(get_session)
+):
     try:
-        return create_sale(db, sale_data.dict())
+        if sale_writer.running:
+            return await sale_writer.submit(sale_data.dict())
+        return await run_db(db, create_sale, sale_data.dict())
+    except OutOfStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except SaleQueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/sales", response_model=List[SaleResponse])
-def get_sales_endpoint(filters: SalesFilter = Depends(), db: Session = Depends(get_db)):
-    return get_sales(db, filters)
+@router.post("/sales/bulk", response_model=SaleBulkResponse)
+async def create_sales_bulk_endpoint(
+    bulk_data: SaleBulkCreate, db: AnySession = Depends(get_session)
+):
+    return await run_db(
+        db, create_sales_bulk, [sale.dict() for sale in bulk_data.sales]
+    )
+
+
+@router.get("/sales", response_model=SalePageResponse)
+async def get_sales_endpoint(
+    filters: SalesFilter = Depends(),
+    pagination: SalesPagination = Depends(),
+    db: AnySession = Depends(get_read_session),
+):
+    try:
+        items, next_cursor = await run_db(
+            db, get_sales, filters, pagination.limit, pagination.cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastResponder.send_model_response(
+        SalePageResponse, {"items": items, "next_cursor": next_cursor}
+    )
+
+
+@router.get("/sales/stream")
+def stream_sales_endpoint(filters: SalesFilter = Depends()):
+    """Stream every matching sale as NDJSON without materializing the result set."""
+
+    def iter_rows():
+        # The request-scoped session is closed before the body is sent,
+        # so the stream owns its session for the lifetime of the cursor.
+        with session_scope() as db:
+            for sale in stream_sales(db, filters, settings.SALES_STREAM_CHUNK_SIZE):
+                row = SaleResponse.model_validate(sale, from_attributes=True)
+                yield row.model_dump_json() + "\n"
+
+    return StreamingResponse(iter_rows(), media_type="application/x-ndjson")
+
+
+def _export_response(export_format: ExportFormat, name: str, columns, export, filters):
+    if export_format in (ExportFormat.PARQUET, ExportFormat.ARROW):
+        if not pyarrow_available():
+            raise HTTPException(
+                status_code=501,
+                detail=f"{export_format.value} export requires pyarrow to be installed",
+            )
+
+    def iter_body():
+        # Like /sales/stream, the export owns its session for the cursor's lifetime
+        with session_scope() as db:
+            chunks = export(db, filters, settings.EXPORT_CHUNK_SIZE)
+            yield from iter_export(export_format, columns, chunks)
+
+    filename = f"{name}.{FILE_EXTENSIONS[export_format]}"
+    return StreamingResponse(
+        iter_body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/sales")
+def export_sales_endpoint(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    filters: SalesFilter = Depends(),
+):
+    """Stream all matching sales as CSV, NDJSON, Parquet or Arrow IPC."""
+    return _export_response(
+        export_format, "sales", SALES_EXPORT_COLUMNS, export_sales, filters
+    )
+
+
+@router.get("/export/inventory_history")
+def export_inventory_history_endpoint(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    filters: InventoryHistoryFilter = Depends(),
+):
+    """Stream matching inventory history as CSV, NDJSON, Parquet or Arrow IPC."""
+    return _export_response(
+        export_format,
+        "inventory_history",
+        INVENTORY_HISTORY_EXPORT_COLUMNS,
+        export_inventory_history,
+        filters,
+    )
 
 
 @router.get("/revenue/{period}", response_model=List[RevenueAnalysis])
-def get_revenue_endpoint(
-    period: str, category: str | None = None, db: Session = Depends(get_db)
+async def get_revenue_endpoint(
+    request: Request,
+    response: Response,
+    period: str,
+    category: str | None = None,
+    db: AnySession = Depends(get_read_session),
 ):
     valid_periods = ["daily", "weekly", "monthly", "annual"]
     if period not in valid_periods:
         raise HTTPException(status_code=400, detail="Invalid period specified")
-    return analyze_revenue(db, period, category)
+    not_modified = await conditional_response(
+        request, response, db, settings.CACHE_CONTROL_REVENUE, SALES
+    )
+    if not_modified:
+        return not_modified
+    rows, versions = await run_db(db, cached_analyze_revenue, period, category)
+    # A cached result may predate the versions checked above
+    set_etag(request, response, settings.CACHE_CONTROL_REVENUE, versions)
+    return FastResponder.send_model_response(
+        List[RevenueAnalysis], rows, headers=dict(response.headers)
+    )
 
 
-@router.post("/revenue/comparison")
-def compare_revenue_endpoint(
-    comparison: RevenueComparison, db: Session = Depends(get_db)
+@router.post("/revenue/comparison", response_model=RevenueComparisonResponse)
+@read_only
+async def compare_revenue_endpoint(
+    comparison: RevenueComparison, db: AnySession = Depends(get_read_session)
 ):
-    return compare_revenue(db, comparison)
+    return await run_db(db, cached_compare_revenue, comparison)
 
 
 @router.get("/inventory", response_model=List[InventoryResponse])
-def get_inventory_endpoint(
-    low_stock_threshold: int = 10, db: Session = Depends(get_db)
+async def get_inventory_endpoint(
+    request: Request,
+    response: Response,
+    low_stock_threshold: int = settings.LOW_STOCK_THRESHOLD,
+    low_stock_only: bool = False,
+    pagination: InventoryPagination = Depends(),
+    db: AnySession = Depends(get_session),
+):
+    """
+    List every product's stock, or with `low_stock_only` one page of the
+    products below the threshold, lowest stock first. Pages are chained through
+    the `X-Next-Cursor` response header, absent on the last page; `limit` and
+    `cursor` only apply to low-stock pages.
+    """
+    not_modified = await conditional_response(
+        request, response, db, settings.CACHE_CONTROL_INVENTORY, INVENTORY
+    )
+    if not_modified:
+        return not_modified
+    if not low_stock_only:
+        rows = await run_db(db, get_inventory, low_stock_threshold)
+        return FastResponder.send_model_response(
+            List[InventoryResponse], rows, headers=dict(response.headers)
+        )
+
+    try:
+        rows, next_cursor = await run_db(
+            db,
+            get_low_stock_inventory,
+            low_stock_threshold,
+            pagination.limit,
+            pagination.cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return FastResponder.send_model_response(
+        List[InventoryResponse], rows, headers=dict(response.headers)
+    )
+
+
+# The rows skip response_model validation, which would cost more than the
+# forecast itself; their schema is documented through `responses` instead
+@router.get(
+    "/inventory/forecast",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[StockForecast]}},
+)
+async def forecast_endpoint(
+    params: ForecastParams = Depends(),
+    db: AnySession = Depends(get_read_session),
+):
+    """
+    Moving-average and exponentially weighted daily sales velocity of every
+    stocked product, with the days until its current stock runs out at the
+    weighted rate, soonest first.
+    """
+    if not numpy_available():
+        raise HTTPException(
+            status_code=501, detail="Stock-out forecasts require numpy to be installed"
+        )
+    columns = await run_db(
+        db,
+        forecast_stockouts,
+        params.history_days,
+        params.window,
+        params.alpha,
+        params.category,
+        params.limit,
+    )
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    return ORJSONResponse(rows)
+
+
+@router.get("/inventory/top", response_model=TopSellersResponse)
+async def top_sellers_endpoint(
+    period: LeaderboardPeriod = LeaderboardPeriod.DAILY,
+    metric: LeaderboardMetric = LeaderboardMetric.REVENUE,
+    category: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_SIZE),
+):
+    """
+    Top sellers of the current day or week, served from this worker's
+    in-memory leaderboard rather than the database.
+    """
+    if not settings.LEADERBOARD_ENABLED:
+        raise HTTPException(status_code=404, detail="Leaderboard is disabled")
+    if not leaderboard.loaded:
+        # Startup normally loads it; this covers a failed or skipped first load
+        await run_in_threadpool(rebuild_leaderboard)
+    return leaderboard.top(period, metric, category, limit)
+
+
+@router.get("/inventory/low_stock/events")
+async def low_stock_events_endpoint():
+    """
+    Server-sent events for products crossing LOW_STOCK_THRESHOLD: `low_stock`
+    when a sale or stock update takes one below it, `restocked` when an update
+    brings it back. Events published while a client is disconnected are not
+    replayed; reconnecting clients should re-read `?low_stock_only=true`.
+    """
+
+    async def iter_events():
+        async with low_stock_events.subscribe(LOW_STOCK_CHANNEL) as queue:
+            # Ask EventSource clients to reconnect quickly after a drop
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), settings.EVENT_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+                yield (
+                    f"event: {event['event']}\n".encode()
+                    + b"data: "
+                    + orjson.dumps(event)
+                    + b"\n\n"
+                )
+
+    return StreamingResponse(
+        iter_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.put("/inventory", response_model=InventoryBulkResponse)
+async def update_inventory_bulk_endpoint(
+    bulk_data: InventoryBulkUpdate, db: AnySession = Depends(get_session)
 ):
-    return get_inventory(db, low_stock_threshold)
+    return await run_db(
+        db, update_inventory_bulk, [item.dict() for item in bulk_data.items]
+    )
 
 
 @router.put("/inventory/{product_id}", response_model=InventoryResponse)
-def update_inventory_endpoint(
-    product_id: int, new_quantity: int, db: Session = Depends(get_db)
+async def update_inventory_endpoint(
+    product_id: int, new_quantity: int, db: AnySession = Depends(get_session)
 ):
     try:
-        updated = update_inventory(db, product_id, new_quantity)
+        updated = await run_db(db, update_inventory, product_id, new_quantity)
         return updated
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -76,7 +368,8 @@ def update_inventory_endpoint(
 @router.get(
     "/inventory/history/{product_id}", response_model=List[InventoryHistoryResponse]
 )
-def get_inventory_history_endpoint(
-    product_id: int, days: int = 30, db: Session = Depends(get_db)
+async def get_inventory_history_endpoint(
+    product_id: int, days: int = 30, db: AnySession = Depends(get_session)
 ):
-    return get_inventory_history(db, product_id, days)
+    rows = await run_db(db, get_inventory_history, product_id, days)
+    return FastResponder.send_model_response(List[InventoryHistoryResponse], rows)
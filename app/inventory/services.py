@@ -1,31 +1,462 @@
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import combinations
 
-from sqlalchemy import func, case
+from sqlalchemy import (
+    Integer,
+    bindparam,
+    case,
+    column,
+    false,
+    func,
+    insert,
+    null,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.inventory.models import Inventory, Sale, Product, InventoryHistory
-from app.inventory.request import SalesFilter, RevenueComparison
+from app.baselayer.basemodel import utc_now
+from app.baselayer.cache import CacheScope
+from app.baselayer.dialect import copy_rows, dialect_name, supports_copy
+from app.inventory.data_versions import INVENTORY, SALES, bump_versions, read_versions
+from app.inventory.exceptions import OutOfStockError
+from app.inventory.leaderboard import record_leaderboard_sales
+from app.inventory.low_stock import publish_low_stock_transitions
+from app.inventory.models import (
+    Inventory,
+    Sale,
+    Product,
+    InventoryHistory,
+    InventoryHistoryDaily,
+    DailyRevenue,
+)
+from app.inventory.request import (
+    SalesFilter,
+    RevenueComparison,
+    InventoryHistoryFilter,
+)
+from app.inventory.retention import raw_history_cutoff
+from app.inventory.revenue_cache import cached, invalidate_revenue, period_start
+from app.inventory.rollup import (
+    period_bucket,
+    record_revenue_buckets,
+    record_sale_revenue,
+)
+from app.inventory.utils.pagination import (
+    decode_cursor,
+    decode_stock_cursor,
+    encode_cursor,
+    encode_stock_cursor,
+)
+from config.config import settings
+from config.database import is_replica
+from config.logging_utils import logger
+
+
+def _reserve_stock(db: Session, product_id: int, quantity: int):
+    """
+    Atomically take `quantity` units of stock and record the change in history.
+    Returns (old_quantity, new_quantity), or None for untracked products.
+    Like every Core statement here, it spells out the soft-delete predicate
+    the ORM adds to selects.
+
+    The decrement is a single conditional UPDATE, so concurrent sales of the same
+    product neither lose updates nor oversell, and no row lock is held across a
+    round trip. Products without an inventory row are not stock-tracked.
+
+    :raises OutOfStockError: If the product is tracked but has too little stock.
+    """
+    inventory = Inventory.__table__
+    new_quantity = db.execute(
+        update(inventory)
+        .where(
+            inventory.c.product_id == product_id,
+            inventory.c.current_quantity >= quantity,
+            inventory.c.is_deleted == false(),
+        )
+        .values(
+            current_quantity=inventory.c.current_quantity - quantity,
+            updated_at=utc_now(),
+        )
+        .returning(inventory.c.current_quantity)
+    ).scalar()
+
+    if new_quantity is None:
+        tracked = db.query(
+            db.query(Inventory).filter(Inventory.product_id == product_id).exists()
+        ).scalar()
+        if tracked:
+            raise OutOfStockError(product_id, quantity)
+        return None
+
+    db.execute(
+        insert(InventoryHistory).values(
+            product_id=product_id,
+            old_quantity=new_quantity + quantity,
+            new_quantity=new_quantity,
+        )
+    )
+    return new_quantity + quantity, new_quantity
 
 
 def create_sale(db: Session, sale_data: dict):
+    """
+    Record one sale, taking its stock and adding it to the rollup.
+
+    :raises ValueError: If the product does not exist.
+    :raises OutOfStockError: If the product has too little stock.
+    """
     db_sale = Sale(**sale_data)
 
-    # Update inventory
-    inventory = (
-        db.query(Inventory)
-        .filter(Inventory.product_id == sale_data["product_id"])
-        .first()
-    )
-    if inventory:
-        inventory.current_quantity -= sale_data["quantity"]
+    stock = _reserve_stock(db, sale_data["product_id"], sale_data["quantity"])
 
     db.add(db_sale)
+    category = record_sale_revenue(
+        db,
+        sale_data["product_id"],
+        sale_data["sale_date"],
+        sale_data["quantity"],
+        sale_data["total_price"],
+    )
+    if category is None:
+        # The rollup found no product to add the sale to
+        db.rollback()
+        raise ValueError(f"Product {sale_data['product_id']} not found")
+    bump_versions(db, INVENTORY, SALES)
     db.commit()
+    invalidate_revenue(sale_data["sale_date"], category)
+    record_leaderboard_sales(
+        db,
+        [
+            (
+                sale_data["sale_date"],
+                sale_data["product_id"],
+                category,
+                sale_data["total_price"],
+                sale_data["quantity"],
+            )
+        ],
+    )
+    if stock:
+        publish_low_stock_transitions([(sale_data["product_id"], *stock)])
     db.refresh(db_sale)
     return db_sale
 
 
-def get_sales(db: Session, filters: SalesFilter):
+def _lock_stock(db: Session, product_ids) -> dict[int, int]:
+    """
+    Current stock of the tracked products among `product_ids`. On Postgres the
+    rows stay locked until commit, so concurrent sales cannot take the same units.
+    """
+    query = (
+        select(Inventory.product_id, Inventory.current_quantity)
+        .where(Inventory.product_id.in_(product_ids))
+        .order_by(Inventory.product_id)
+    )
+    if dialect_name(db) == "postgresql":
+        query = query.with_for_update()
+    return dict(db.execute(query).all())
+
+
+def _allocate_stock(sales, categories: dict[int, str], stock: dict[int, int]):
+    """
+    Grant `stock` to `sales` in order. Returns, for each sale, None if accepted
+    or the exception rejecting it (ValueError for an unknown product,
+    OutOfStockError once the product's stock is used up), and the grouped
+    per-product decrements of the accepted sales.
+    """
+    rejections = []
+    decrements = defaultdict(int)
+    for sale in sales:
+        product_id, quantity = sale["product_id"], sale["quantity"]
+        if product_id not in categories:
+            rejections.append(ValueError(f"Product {product_id} not found"))
+            continue
+        # Products without an inventory row are not stock-tracked
+        if product_id in stock:
+            if stock[product_id] < quantity:
+                rejections.append(OutOfStockError(product_id, quantity))
+                continue
+            stock[product_id] -= quantity
+            decrements[product_id] += quantity
+        rejections.append(None)
+    return rejections, decrements
+
+
+def _decrement_inventory(db: Session, decrements: dict[int, int]):
+    """
+    Subtract the aggregated per-product quantities from inventory and return
+    (product_id, old_quantity, new_quantity) for every product. Postgres uses
+    one set-based UPDATE ... FROM (VALUES ...); elsewhere each product is
+    updated on its own, which costs no round trips on SQLite.
+
+    Like `_reserve_stock`, a product is only decremented while it has enough
+    stock, so stock never goes negative.
+
+    :raises OutOfStockError: If a product has too little stock; the caller
+        must roll back the transaction.
+    """
+    if not decrements:
+        return []
+
+    inventory = Inventory.__table__
+    if dialect_name(db) == "postgresql":
+        deltas = values(
+            column("product_id", Integer), column("quantity", Integer), name="deltas"
+        ).data(list(decrements.items()))
+        remaining = db.execute(
+            update(inventory)
+            .where(
+                inventory.c.product_id == deltas.c.product_id,
+                inventory.c.current_quantity >= deltas.c.quantity,
+                inventory.c.is_deleted == false(),
+            )
+            .values(
+                current_quantity=inventory.c.current_quantity - deltas.c.quantity,
+                updated_at=utc_now(),
+            )
+            .returning(inventory.c.product_id, inventory.c.current_quantity)
+        ).all()
+    else:
+        remaining = []
+        for product_id, quantity in decrements.items():
+            remaining += db.execute(
+                update(inventory)
+                .where(
+                    inventory.c.product_id == product_id,
+                    inventory.c.current_quantity >= quantity,
+                    inventory.c.is_deleted == false(),
+                )
+                .values(
+                    current_quantity=inventory.c.current_quantity - quantity,
+                    updated_at=utc_now(),
+                )
+                .returning(inventory.c.product_id, inventory.c.current_quantity)
+            ).all()
+
+    if len(remaining) < len(decrements):
+        short = set(decrements) - {product_id for product_id, _ in remaining}
+        product_id = min(short)
+        raise OutOfStockError(product_id, decrements[product_id])
+    return [
+        (product_id, quantity + decrements[product_id], quantity)
+        for product_id, quantity in remaining
+    ]
+
+
+def _take_stock(db: Session, decrements: dict[int, int]):
+    """
+    Decrement inventory as `_decrement_inventory` does and record a history
+    row per product in the same transaction.
+    """
+    stock_changes = _decrement_inventory(db, decrements)
+    if stock_changes:
+        db.execute(
+            insert(InventoryHistory),
+            [
+                {"product_id": product_id, "old_quantity": old, "new_quantity": new}
+                for product_id, old, new in stock_changes
+            ],
+        )
+    return stock_changes
+
+
+def _insert_sales(db: Session, rows: list[dict]):
+    """Insert sale rows with COPY on Postgres/psycopg2, executemany otherwise."""
+    now = utc_now()
+    rows = [
+        {**row, "created_at": now, "updated_at": now, "is_deleted": False}
+        for row in rows
+    ]
+    if supports_copy(db):
+        columns = list(rows[0])
+        copy_rows(
+            db, Sale.__table__, columns, [tuple(r[c] for c in columns) for r in rows]
+        )
+    else:
+        db.execute(insert(Sale), rows)
+
+
+def _revenue_buckets(sales, categories: dict[int, str]) -> dict:
+    """Daily revenue rollup rows of `sales`, keyed by (day, product_id, category)."""
+    buckets = {}
+    for sale in sales:
+        key = (sale["sale_date"], sale["product_id"], categories[sale["product_id"]])
+        bucket = buckets.setdefault(
+            key,
+            dict(
+                zip(("day", "product_id", "category"), key),
+                total_revenue=0,
+                total_quantity=0,
+                sale_count=0,
+            ),
+        )
+        bucket["total_revenue"] += sale["total_price"]
+        bucket["total_quantity"] += sale["quantity"]
+        bucket["sale_count"] += 1
+    return buckets
+
+
+def _sales_committed(db: Session, buckets: dict, stock_changes):
+    """
+    Invalidate, count and announce a committed group of sales. The sales are
+    written by then, so a failure here is logged rather than raised: callers
+    must not report them failed, nor retry them.
+    """
+    try:
+        for day, _, category in buckets:
+            invalidate_revenue(day, category)
+        record_leaderboard_sales(
+            db,
+            [
+                (*key, bucket["total_revenue"], bucket["total_quantity"])
+                for key, bucket in buckets.items()
+            ],
+        )
+        publish_low_stock_transitions(stock_changes)
+    except Exception as exc:
+        logger.error(
+            {
+                "method": "_sales_committed",
+                "message": "Committed sales could not be announced",
+                "error": str(exc),
+            }
+        )
+
+
+def create_sales_bulk(db: Session, sales: list[dict]):
+    """
+    Record many sales at once. Each batch of `SALES_BULK_BATCH_SIZE` items is
+    written in its own transaction: one bulk insert, one grouped inventory
+    decrement with a history row per product and one rollup upsert. Stock is
+    granted to the items in order. Items for unknown products, items the stock
+    no longer covers, and items of a batch that fails are reported back by
+    index instead of aborting the rest.
+    """
+    product_ids = {sale["product_id"] for sale in sales}
+    categories = dict(
+        db.query(Product.id, Product.category).filter(Product.id.in_(product_ids)).all()
+    )
+
+    errors = []
+    valid = []
+    for index, sale in enumerate(sales):
+        if sale["product_id"] in categories:
+            valid.append((index, sale))
+        else:
+            errors.append(
+                {
+                    "index": index,
+                    "product_id": sale["product_id"],
+                    "error": "Product not found",
+                }
+            )
+
+    created = 0
+    batch_size = settings.SALES_BULK_BATCH_SIZE
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start : start + batch_size]
+        try:
+            stock = _lock_stock(db, {sale["product_id"] for _, sale in batch})
+            rejections, decrements = _allocate_stock(
+                (sale for _, sale in batch), categories, stock
+            )
+            accepted = []
+            for (index, sale), rejection in zip(batch, rejections):
+                if rejection is None:
+                    accepted.append(sale)
+                else:
+                    errors.append(
+                        {
+                            "index": index,
+                            "product_id": sale["product_id"],
+                            "error": "Insufficient stock",
+                        }
+                    )
+            if not accepted:
+                db.rollback()
+                continue
+
+            buckets = _revenue_buckets(accepted, categories)
+            _insert_sales(db, accepted)
+            stock_changes = _take_stock(db, decrements)
+            record_revenue_buckets(db, list(buckets.values()))
+            bump_versions(db, INVENTORY, SALES)
+            db.commit()
+            created += len(accepted)
+        except (SQLAlchemyError, OutOfStockError) as exc:
+            db.rollback()
+            logger.error(
+                {
+                    "method": "create_sales_bulk",
+                    "message": "Sale batch failed",
+                    "batch_start": batch[0][0],
+                    "batch_size": len(batch),
+                    "error": str(exc),
+                }
+            )
+            failed = {error["index"] for error in errors}
+            errors.extend(
+                {
+                    "index": index,
+                    "product_id": sale["product_id"],
+                    "error": "Batch could not be written",
+                }
+                for index, sale in batch
+                if index not in failed
+            )
+        else:
+            _sales_committed(db, buckets, stock_changes)
+
+    errors.sort(key=lambda error: error["index"])
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+
+def create_sales_grouped(db: Session, sales: list[dict]) -> list:
+    """
+    Record independent sales, queued by the group-commit writer, in one
+    transaction: one multi-row insert, one grouped inventory decrement with a
+    history row per product, and one rollup upsert.
+
+    Stock is granted to the sales in order, so a sale that no longer fits is
+    rejected alone. Returns, for each sale in order, the created row as a dict
+    or the exception rejecting it: OutOfStockError, or ValueError for an
+    unknown product.
+    """
+    product_ids = {sale["product_id"] for sale in sales}
+    categories = dict(
+        db.query(Product.id, Product.category).filter(Product.id.in_(product_ids)).all()
+    )
+    stock = _lock_stock(db, product_ids)
+    results, decrements = _allocate_stock(sales, categories, stock)
+    accepted = [sale for sale, result in zip(sales, results) if result is None]
+
+    if not accepted:
+        return results
+
+    sale_ids = db.scalars(
+        insert(Sale).returning(Sale.id, sort_by_parameter_order=True), accepted
+    ).all()
+    stock_changes = _take_stock(db, decrements)
+    buckets = _revenue_buckets(accepted, categories)
+    record_revenue_buckets(db, list(buckets.values()))
+    bump_versions(db, INVENTORY, SALES)
+    db.commit()
+    _sales_committed(db, buckets, stock_changes)
+
+    created = iter(zip(accepted, sale_ids))
+    for index, result in enumerate(results):
+        if result is None:
+            sale, sale_id = next(created)
+            results[index] = {**sale, "id": sale_id}
+    return results
+
+
+def _filtered_sales_query(db: Session, filters: SalesFilter):
     query = db.query(Sale)
 
     if filters.start_date:
@@ -37,96 +468,405 @@ def get_sales(db: Session, filters: SalesFilter):
     if filters.category:
         query = query.join(Product).filter(Product.category == filters.category)
 
-    return query.all()
+    return query.order_by(Sale.sale_date, Sale.id)
 
 
-def analyze_revenue(db: Session, period: str, category: str | None):
-    date_formats = {
-        "daily": "%Y-%m-%d",
-        "weekly": "%Y-%u",
-        "monthly": "%Y-%m",
-        "annual": "%Y",
-    }
+def get_sales(db: Session, filters: SalesFilter, limit: int, cursor: str | None = None):
+    """
+    Return one keyset page of sales ordered by (sale_date, id) together with the
+    cursor of the next page, or None when the last page has been reached.
+    """
+    query = _filtered_sales_query(db, filters)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Sale.sale_date, Sale.id) > tuple_(last_date, last_id)
+        )
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.sale_date, last.id)
+
+    return items, next_cursor
+
+
+def stream_sales(db: Session, filters: SalesFilter, chunk_size: int):
+    """Yield matching sales through a server-side cursor, `chunk_size` rows at a time."""
+    query = _filtered_sales_query(db, filters).yield_per(chunk_size)
+    for sale in query:
+        yield sale
+
+
+# Mapped attributes rather than table columns, so soft-deleted rows are skipped
+SALES_EXPORT_COLUMNS = [
+    getattr(Sale, name)
+    for name in ("id", "product_id", "quantity", "sale_date", "total_price")
+]
 
+INVENTORY_HISTORY_EXPORT_COLUMNS = [
+    getattr(InventoryHistory, name)
+    for name in ("id", "product_id", "old_quantity", "new_quantity", "change_date")
+]
+
+
+def export_sales(db: Session, filters: SalesFilter, chunk_size: int):
+    """Yield lists of at most `chunk_size` sale rows read through a server-side cursor."""
+    query = _filtered_sales_query(db, filters).with_entities(*SALES_EXPORT_COLUMNS)
+    result = db.execute(query.statement, execution_options={"yield_per": chunk_size})
+    yield from result.partitions()
+
+
+def export_inventory_history(
+    db: Session, filters: InventoryHistoryFilter, chunk_size: int
+):
+    """Yield lists of at most `chunk_size` history rows read through a server-side cursor."""
+    query = db.query(*INVENTORY_HISTORY_EXPORT_COLUMNS)
+    if filters.product_id:
+        query = query.filter(InventoryHistory.product_id == filters.product_id)
+    if filters.start_date:
+        query = query.filter(InventoryHistory.change_date >= filters.start_date)
+    if filters.end_date:
+        query = query.filter(
+            InventoryHistory.change_date < filters.end_date + timedelta(days=1)
+        )
+    query = query.order_by(InventoryHistory.change_date, InventoryHistory.id)
+    result = db.execute(query.statement, execution_options={"yield_per": chunk_size})
+    yield from result.partitions()
+
+
+def analyze_revenue(
+    db: Session,
+    period: str,
+    category: str | None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    # Aggregate the daily rollup rather than scanning raw sales
+    bucket = period_bucket(db, period, DailyRevenue.day)
     query = db.query(
-        func.strftime(date_formats[period], Sale.sale_date).label("period"),
-        func.sum(Sale.total_price).label("total_revenue"),
-        Product.category if category else None,
-    ).join(Product)
+        bucket.label("period"),
+        func.sum(DailyRevenue.total_revenue).label("total_revenue"),
+        (DailyRevenue.category if category else null()).label("category"),
+    )
 
+    if start_date:
+        query = query.filter(DailyRevenue.day >= start_date)
+    if end_date:
+        query = query.filter(DailyRevenue.day <= end_date)
     if category:
-        query = query.filter(Product.category == category)
-        query = query.group_by("period", Product.category)
+        query = query.filter(DailyRevenue.category == category)
+        query = query.group_by(bucket, DailyRevenue.category)
     else:
-        query = query.group_by("period")
+        query = query.group_by(bucket)
 
-    return query.all()
+    return query.order_by(bucket).all()
 
 
-def compare_revenue(db: Session, comp_data: RevenueComparison):
-    # First period calculation
-    period1 = db.query(func.sum(Sale.total_price)).filter(
-        Sale.sale_date.between(comp_data.period1_start, comp_data.period1_end)
-    )
+def _replica_ttl(db: Session) -> float | None:
+    """
+    Longest a result read through `db` may be cached. A replica can trail
+    writes whose invalidation already ran, by up to the allowed lag plus the
+    time until the next lag check; the primary never does.
+    """
+    if is_replica(db):
+        return settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_CHECK_SECONDS
+    return None
+
+
+def cached_analyze_revenue(db: Session, period: str, category: str | None):
+    """
+    `analyze_revenue` through the revenue cache, with the data version of the
+    sales it reflects. Buckets before the current period are cached separately
+    from the current one, so the writes of the day only invalidate the small
+    recent part and closed periods stay cached.
 
-    # Second period calculation
-    period2 = db.query(func.sum(Sale.total_price)).filter(
-        Sale.sale_date.between(comp_data.period2_start, comp_data.period2_end)
+    Each part is cached with the version read before computing it; the
+    result reflects at least the older of the two.
+    """
+    category = category or None
+    if not settings.REVENUE_CACHE_ENABLED:
+        versions = read_versions(db, [SALES])
+        rows = analyze_revenue(db, period, category)
+        return [dict(row._mapping) for row in rows], versions
+
+    horizon = period_start(period, date.today())
+    history_end = horizon - timedelta(days=1)
+
+    def compute(start_date=None, end_date=None):
+        versions = read_versions(db, [SALES])
+        rows = analyze_revenue(db, period, category, start_date, end_date)
+        return {"versions": versions, "rows": [dict(row._mapping) for row in rows]}
+
+    history = cached(
+        ("analyze_revenue", "versioned", period, category, "history", horizon),
+        CacheScope(end=history_end, category=category),
+        lambda: compute(end_date=history_end),
+        _replica_ttl(db),
+    )
+    recent = cached(
+        ("analyze_revenue", "versioned", period, category, "recent", horizon),
+        CacheScope(start=horizon, category=category),
+        lambda: compute(start_date=horizon),
+        _replica_ttl(db),
     )
+    versions = min(history["versions"], recent["versions"], key=lambda v: v[SALES])
+    return history["rows"] + recent["rows"], versions
 
+
+def compare_revenue(db: Session, comp_data: RevenueComparison):
+    periods = comp_data.periods
+    labels = [p.label or f"{p.start_date}..{p.end_date}" for p in periods]
+
+    # One conditional aggregate per period, answered by a single scan of the
+    # date range covering all of them
+    query = db.query(
+        *[
+            func.sum(
+                case(
+                    (
+                        DailyRevenue.day.between(p.start_date, p.end_date),
+                        DailyRevenue.total_revenue,
+                    ),
+                    else_=0,
+                )
+            ).label(f"period_{i}")
+            for i, p in enumerate(periods)
+        ]
+    ).filter(
+        DailyRevenue.day.between(
+            min(p.start_date for p in periods), max(p.end_date for p in periods)
+        )
+    )
     if comp_data.category:
-        period1 = period1.join(Product).filter(Product.category == comp_data.category)
-        period2 = period2.join(Product).filter(Product.category == comp_data.category)
+        query = query.filter(DailyRevenue.category == comp_data.category)
 
-    p1_total = period1.scalar() or 0
-    p2_total = period2.scalar() or 0
+    totals = [value or 0 for value in query.one()]
+
+    comparisons = []
+    for i, j in combinations(range(len(periods)), 2):
+        base_total, compare_total = totals[i], totals[j]
+        comparisons.append(
+            {
+                "base": labels[i],
+                "compare": labels[j],
+                "difference": compare_total - base_total,
+                "percentage_change": (
+                    ((compare_total - base_total) / base_total * 100)
+                    if base_total != 0
+                    else 0
+                ),
+            }
+        )
 
     return {
-        "period1_total": p1_total,
-        "period2_total": p2_total,
-        "difference": p2_total - p1_total,
-        "percentage_change": (
-            ((p2_total - p1_total) / p1_total * 100) if p1_total != 0 else 0
-        ),
+        "periods": [
+            {
+                "label": label,
+                "start_date": p.start_date,
+                "end_date": p.end_date,
+                "total_revenue": total,
+            }
+            for label, p, total in zip(labels, periods, totals)
+        ],
+        "comparisons": comparisons,
     }
 
 
-def get_inventory(db: Session, low_stock_threshold: int = 10):
-    return (
-        db.query(
-            Inventory.product_id,
-            Product.name.label("product_name"),
-            Product.category,
-            Inventory.current_quantity,
-            Inventory.last_updated,
-            case(
-                (Inventory.current_quantity < low_stock_threshold, True), else_=False
-            ).label("low_stock"),
+def cached_compare_revenue(db: Session, comp_data: RevenueComparison):
+    """`compare_revenue` through the revenue cache, keyed by the normalized periods."""
+    if not settings.REVENUE_CACHE_ENABLED:
+        return compare_revenue(db, comp_data)
+
+    category = comp_data.category or None
+    periods = tuple((p.start_date, p.end_date, p.label) for p in comp_data.periods)
+    scope = CacheScope(
+        start=min(p.start_date for p in comp_data.periods),
+        end=max(p.end_date for p in comp_data.periods),
+        category=category,
+    )
+    return cached(
+        ("compare_revenue", category, periods),
+        scope,
+        lambda: compare_revenue(db, comp_data),
+        _replica_ttl(db),
+    )
+
+
+def _inventory_query(
+    db: Session, low_stock_threshold: int = settings.LOW_STOCK_THRESHOLD
+):
+    return db.query(
+        Inventory.product_id,
+        Product.name.label("product_name"),
+        Product.category,
+        Inventory.current_quantity,
+        Inventory.last_updated,
+        case(
+            (Inventory.current_quantity < low_stock_threshold, True), else_=False
+        ).label("low_stock"),
+    ).join(Product)
+
+
+def get_inventory(db: Session, low_stock_threshold: int = settings.LOW_STOCK_THRESHOLD):
+    return _inventory_query(db, low_stock_threshold).all()
+
+
+def get_low_stock_inventory(
+    db: Session, low_stock_threshold: int, limit: int, cursor: str | None = None
+):
+    """
+    Return one keyset page of the products below `low_stock_threshold`, lowest
+    stock first, together with the cursor of the next page or None.
+
+    Walks ix_inventory_current_quantity_product_id, so the cost follows the
+    number of low-stock products rather than the size of the catalog.
+    """
+    query = _inventory_query(db, low_stock_threshold).filter(
+        Inventory.current_quantity < low_stock_threshold
+    )
+    if cursor:
+        last_quantity, last_product_id = decode_stock_cursor(cursor)
+        query = query.filter(
+            tuple_(Inventory.current_quantity, Inventory.product_id)
+            > tuple_(last_quantity, last_product_id)
         )
-        .join(Product)
+
+    rows = (
+        query.order_by(Inventory.current_quantity, Inventory.product_id)
+        .limit(limit + 1)
         .all()
     )
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_stock_cursor(last.current_quantity, last.product_id)
 
+    return items, next_cursor
 
-def update_inventory(db: Session, product_id: int, new_quantity: int):
-    inventory = db.query(Inventory).filter(Inventory.product_id == product_id).first()
-    if not inventory:
-        raise ValueError("Product not found in inventory")
 
-    history = InventoryHistory(
-        product_id=product_id,
-        old_quantity=inventory.current_quantity,
-        new_quantity=new_quantity,
+def _set_inventory_quantities(db: Session, quantities: dict[int, int]) -> list:
+    """
+    Set the stock of many products with one set-based UPDATE (UPDATE ... FROM
+    (VALUES ...) RETURNING on Postgres, a SELECT and executemany elsewhere) and
+    return (product_id, old_quantity, new_quantity) for every product that has
+    an inventory row.
+    """
+    inventory = Inventory.__table__
+    current = select(inventory.c.product_id, inventory.c.current_quantity).where(
+        inventory.c.product_id.in_(list(quantities)),
+        inventory.c.is_deleted == false(),
     )
-    inventory.current_quantity = new_quantity
-    db.add(history)
+
+    if dialect_name(db) == "postgresql":
+        targets = values(
+            column("product_id", Integer),
+            column("new_quantity", Integer),
+            name="targets",
+        ).data(list(quantities.items()))
+        # RETURNING only sees new values; join the locked pre-update rows so the
+        # old quantities are exactly the ones this statement replaced
+        old = current.with_for_update().cte("old")
+        return db.execute(
+            update(inventory)
+            .where(
+                inventory.c.product_id == targets.c.product_id,
+                old.c.product_id == targets.c.product_id,
+            )
+            .values(current_quantity=targets.c.new_quantity, updated_at=utc_now())
+            .returning(
+                inventory.c.product_id,
+                old.c.current_quantity.label("old_quantity"),
+                inventory.c.current_quantity.label("new_quantity"),
+            )
+        ).all()
+
+    old = dict(db.execute(current).all())
+    if old:
+        db.execute(
+            update(inventory)
+            .where(
+                inventory.c.product_id == bindparam("p_id"),
+                inventory.c.is_deleted == false(),
+            )
+            .values(current_quantity=bindparam("p_quantity"), updated_at=utc_now()),
+            [
+                {"p_id": product_id, "p_quantity": quantities[product_id]}
+                for product_id in old
+            ],
+        )
+    return [
+        (product_id, old_quantity, quantities[product_id])
+        for product_id, old_quantity in old.items()
+    ]
+
+
+def update_inventory_bulk(db: Session, items: list[dict]):
+    """
+    Set the stock of many products in one transaction: one UPDATE for all
+    quantities and one multi-row insert for their history. Products without an
+    inventory row are reported back by index instead of aborting the rest; if a
+    product is listed more than once, its last quantity wins.
+    """
+    quantities = {item["product_id"]: item["new_quantity"] for item in items}
+    changes = _set_inventory_quantities(db, quantities)
+
+    if changes:
+        # Every count gets a history row, even one confirming the current
+        # stock, as stock-count audits read them
+        db.execute(
+            insert(InventoryHistory),
+            [
+                {"product_id": product_id, "old_quantity": old, "new_quantity": new}
+                for product_id, old, new in changes
+            ],
+        )
+        bump_versions(db, INVENTORY)
     db.commit()
-    return inventory
+    if changes:
+        publish_low_stock_transitions(changes)
+
+    found = {product_id for product_id, _, _ in changes}
+    errors = [
+        {
+            "index": index,
+            "product_id": item["product_id"],
+            "error": "Product not found in inventory",
+        }
+        for index, item in enumerate(items)
+        if item["product_id"] not in found
+    ]
+    return {
+        "updated": len(changes),
+        "failed": len(errors),
+        "items": [
+            {"product_id": product_id, "old_quantity": old, "new_quantity": new}
+            for product_id, old, new in sorted(changes)
+        ],
+        "errors": errors,
+    }
+
+
+def update_inventory(db: Session, product_id: int, new_quantity: int):
+    result = update_inventory_bulk(
+        db, [{"product_id": product_id, "new_quantity": new_quantity}]
+    )
+    if result["failed"]:
+        raise ValueError("Product not found in inventory")
+    return _inventory_query(db).filter(Inventory.product_id == product_id).one()
 
 
 def get_inventory_history(db: Session, product_id: int, days: int = 30):
+    """
+    Changes of the last `days` days, newest first. Days compacted out of the
+    raw window come back as one summary entry each, dated at midnight.
+    """
     start_date = datetime.now() - timedelta(days=days)
-    return (
+    history = (
         db.query(InventoryHistory)
         .filter(
             InventoryHistory.product_id == product_id,
@@ -135,3 +875,28 @@ def get_inventory_history(db: Session, product_id: int, days: int = 30):
         .order_by(InventoryHistory.change_date.desc())
         .all()
     )
+    if start_date >= raw_history_cutoff():
+        return history
+
+    summaries = (
+        db.query(InventoryHistoryDaily)
+        .filter(
+            InventoryHistoryDaily.product_id == product_id,
+            InventoryHistoryDaily.day >= start_date.date(),
+        )
+        .order_by(InventoryHistoryDaily.day.desc())
+        .all()
+    )
+    # Summaries only cover days before the raw window, so they follow its rows
+    return history + [
+        {
+            "old_quantity": summary.open_quantity,
+            "new_quantity": summary.close_quantity,
+            "change_date": datetime.combine(summary.day, datetime.min.time()),
+            "compacted": True,
+            "change_count": summary.change_count,
+            "min_quantity": summary.min_quantity,
+            "max_quantity": summary.max_quantity,
+        }
+        for summary in summaries
+    ]
@@ -0,0 +1,87 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.inventory.data_versions import read_versions
+from config.config import settings
+from config.database import AnySession, run_db
+
+
+def compute_etag(request: Request, versions: dict[str, int]) -> str:
+    """
+    Strong ETag for a GET response built from the data `versions` it reflects.
+
+    It covers the path, the query parameters and the application version, so
+    it changes with the representation as well as the data.
+    """
+    fingerprint = "|".join(
+        [
+            settings.PROJECT_VERSION,
+            request.url.path,
+            str(sorted(request.query_params.multi_items())),
+            *(f"{name}={version}" for name, version in sorted(versions.items())),
+        ]
+    )
+    return '"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _headers(etag: str, cache_control: str) -> dict:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def set_etag(
+    request: Request,
+    response: Response,
+    cache_control: str,
+    versions: dict[str, int],
+):
+    """
+    Tag `response` with the data `versions` its body reflects, e.g. those of
+    a cached result older than the versions checked before computing it.
+    """
+    if settings.ETAG_ENABLED:
+        response.headers.update(
+            _headers(compute_etag(request, versions), cache_control)
+        )
+
+
+async def conditional_response(
+    request: Request,
+    response: Response,
+    db: AnySession,
+    cache_control: str,
+    *names: str,
+) -> Optional[Response]:
+    """
+    Set ETag and Cache-Control on `response` for the current versions of the
+    data `names`, read from `db` before the route reads the data itself: a
+    write landing in between then only costs one extra full response on the
+    next request, never a stale 304.
+
+    Returns a 304 response when the request's If-None-Match already matches,
+    in which case the route returns it without querying or serializing.
+    Returns None, and sets no headers, when ETags are disabled.
+    """
+    if not settings.ETAG_ENABLED:
+        return None
+
+    versions = await run_db(db, read_versions, names)
+    etag = compute_etag(request, versions)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=_headers(etag, cache_control),
+        )
+    response.headers.update(_headers(etag, cache_control))
+    return None
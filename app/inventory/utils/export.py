@@ -0,0 +1,140 @@
+import csv
+import io
+from typing import Iterable, Iterator, Sequence
+
+import orjson
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String
+
+from app.inventory.enums import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+FILE_EXTENSIONS = {
+    ExportFormat.CSV: "csv",
+    ExportFormat.NDJSON: "ndjson",
+    ExportFormat.PARQUET: "parquet",
+    ExportFormat.ARROW: "arrows",
+}
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _iter_csv(columns, chunks) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _iter_ndjson(columns, chunks) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    for rows in chunks:
+        yield b"".join(
+            orjson.dumps(dict(zip(names, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose written bytes can be taken out between batches."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+
+    arrow_types = [
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        (DateTime, pa.timestamp("us")),
+        (Date, pa.date32()),
+        (Boolean, pa.bool_()),
+        (String, pa.string()),
+    ]
+    fields = []
+    for column in columns:
+        arrow_type = next(
+            (t for sql_type, t in arrow_types if isinstance(column.type, sql_type)),
+            pa.string(),
+        )
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _iter_arrow(columns, chunks, export_format: ExportFormat) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(columns)
+    sink = _DrainableSink()
+    if export_format == ExportFormat.PARQUET:
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for rows in chunks:
+            # Each chunk becomes one record batch / row group
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array([row[i] for row in rows], type=field.type)
+                        for i, field in enumerate(schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(
+    export_format: ExportFormat,
+    columns: Sequence,
+    chunks: Iterable[Sequence],
+) -> Iterator:
+    """
+    Encode chunks of result rows in `export_format`, yielding one piece of the
+    response body per chunk so memory stays bounded by the chunk size.
+
+    :param columns: The SQLAlchemy columns the rows were selected from.
+    :param chunks: Lists of rows, as produced by `Result.partitions()`.
+    """
+    if export_format == ExportFormat.CSV:
+        return _iter_csv(columns, chunks)
+    if export_format == ExportFormat.NDJSON:
+        return _iter_ndjson(columns, chunks)
+    return _iter_arrow(columns, chunks, export_format)
@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(sale_date: date, sale_id: int) -> str:
+    """Encode the (sale_date, id) keyset position into an opaque cursor string."""
+    return _encode({"d": sale_date.isoformat(), "i": sale_id})
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        data = _decode(cursor)
+        return date.fromisoformat(data["d"]), int(data["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def encode_stock_cursor(quantity: int, product_id: int) -> str:
+    """Encode the (current_quantity, product_id) keyset position of an inventory page."""
+    return _encode({"q": quantity, "p": product_id})
+
+
+def decode_stock_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decode a cursor produced by `encode_stock_cursor`.
+
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        data = _decode(cursor)
+        return int(data["q"]), int(data["p"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
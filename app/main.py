@@ -1,23 +1,61 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import ValidationError
 from app.inventory import routes as inventory_routes
+from app.inventory.group_commit import sale_writer
+from app.inventory.leaderboard import reconcile_leaderboard
+from app.inventory.revenue_cache import revenue_cache
 from app.middleware.exception_handlers import (
     error_handling_middleware,
     validation_exception_handler,
     handle_http_exception,
 )
+from app.middleware.metrics import (
+    RequestMetricsMiddleware,
+    instrument_queries,
+    request_metrics,
+)
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
 from config.config import settings
+from config.database import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    get_pool_stats,
+    replica_engine,
+    replica_monitor,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Loads the leaderboard now, then keeps reconciling it with the database
+    reconcile = None
+    if settings.LEADERBOARD_ENABLED:
+        reconcile = asyncio.create_task(reconcile_leaderboard())
+    if settings.SALES_GROUP_COMMIT_ENABLED:
+        sale_writer.start()
+    yield
+    # Queued sales were acknowledged to nobody yet; commit them before exiting
+    await sale_writer.stop()
+    if reconcile:
+        reconcile.cancel()
+
 
 app = FastAPI(
     title=settings.SERVICE_NAME,
     version=settings.PROJECT_VERSION,
     description="This is a description of my API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Enable CORS for all origins
@@ -36,6 +74,19 @@ app.add_exception_handler(ValidationError, validation_exception_handler)
 # Register the error handling middleware
 app.middleware("http")(error_handling_middleware)
 
+# Marks clients that just wrote, whatever handled the response
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Outermost, so timings and status codes include the error handling above
+app.add_middleware(RequestMetricsMiddleware)
+instrument_queries(engine)
+if async_engine is not None:
+    instrument_queries(async_engine.sync_engine)
+if replica_engine is not None:
+    instrument_queries(replica_engine)
+if async_replica_engine is not None:
+    instrument_queries(async_replica_engine.sync_engine)
+
 os.makedirs("media", exist_ok=True)
 os.makedirs("static", exist_ok=True)
 app.mount("/media", StaticFiles(directory="media"), name="media")
@@ -53,6 +104,30 @@ def health_check():
     }
 
 
+@app.get("/health_check/db_pool", tags=["Service Health Check"])
+def db_pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/health_check/replica", tags=["Service Health Check"])
+def replica_status():
+    if replica_monitor is None:
+        return {"configured": False}
+    return {"configured": True, **replica_monitor.status()}
+
+
+@app.get("/health_check/revenue_cache", tags=["Service Health Check"])
+def revenue_cache_stats():
+    return revenue_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        request_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
 app.include_router(inventory_routes.router, prefix="/inventory", tags=["inventory"])
 
 
@@ -63,4 +138,5 @@ def redirect_to_swagger():
 
 
 if __name__ == "__main__":
+    # Single process for development; production runs `python -m app.serve`
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -5,7 +5,8 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 
 from app.baselayer.baseview import FastResponder
-from config.logging_utils import logger
+from config.config import settings
+from config.logging_utils import loggable_headers, logger, truncate
 
 
 async def error_handling_middleware(request: Request, call_next):
@@ -66,7 +67,7 @@ async def handle_unexpected_error(request: Request, exc):
             "method": "handle_unexpected_error",
             "message": "Validation error occurred",
             "path": request.url.path,
-            "request_headers": request.headers,
+            "request_headers": loggable_headers(request.headers),
             "error": str(exc),
         }
     )
@@ -85,8 +86,17 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "method": "validation_exception_handler",
             "message": "Validation error occurred",
             "path": request.url.path,
-            "request_headers": request.headers,
-            "error": exc.errors(),
+            "request_headers": loggable_headers(request.headers),
+            "error": [
+                {
+                    "loc": error["loc"],
+                    "msg": error["msg"],
+                    "type": error["type"],
+                    "input": truncate(error.get("input")),
+                }
+                for error in errors[: settings.LOG_VALIDATION_MAX_ERRORS]
+            ],
+            "error_count": len(errors),
         }
     )
 
@@ -0,0 +1,278 @@
+# /app/middleware/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from config.config import settings
+from config.database import get_pool_stats
+from config.logging_utils import log_stats, logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+# Label used for requests that did not match any route, to bound cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL executed on behalf of the current request."""
+
+    statements: int = 0
+    db_time: float = 0.0
+    captured: list = field(default_factory=list)
+    capture: bool = False
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_time += seconds
+        if self.capture and len(self.captured) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+            self.captured.append(
+                {"statement": statement, "duration_ms": round(seconds * 1000, 3)}
+            )
+
+
+# Set by the middleware for the duration of a request; threadpool workers and
+# run_sync greenlets inherit it, so SQL from either path is attributed here
+current_request_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by label values."""
+
+    def __init__(self, name: str, description: str, buckets: tuple):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = defaultdict(lambda: [[0] * len(buckets), 0.0, 0])
+
+    def observe(self, labels: tuple, value: float):
+        counts, _, _ = series = self._series[labels]
+        index = bisect_left(self.buckets, value)
+        if index < len(counts):
+            counts[index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            base = _format_labels(label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(label_names + ("le",), labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(label_names + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Per-route request metrics, rendered in the Prometheus text format."""
+
+    ROUTE_LABELS = ("method", "route")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "Time from receiving the request to sending the last body chunk.",
+            LATENCY_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "http_request_db_seconds",
+            "Time spent executing SQL per request.",
+            LATENCY_BUCKETS,
+        )
+        self.statements = Histogram(
+            "http_request_db_statements",
+            "Number of SQL statements executed per request.",
+            STATEMENT_BUCKETS,
+        )
+        self.responses = defaultdict(int)
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        stats: RequestQueryStats,
+    ):
+        labels = (method, route)
+        with self._lock:
+            self.latency.observe(labels, duration)
+            self.db_time.observe(labels, stats.db_time)
+            self.statements.observe(labels, stats.statements)
+            self.responses[labels + (str(status),)] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for histogram in (self.latency, self.db_time, self.statements):
+                lines += histogram.render(self.ROUTE_LABELS)
+            lines += [
+                "# HELP http_requests_total Requests served, by response status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for labels, count in sorted(self.responses.items()):
+                label_text = _format_labels(self.ROUTE_LABELS + ("status",), labels)
+                lines.append(f"http_requests_total{label_text} {count}")
+        lines += _render_pool_stats()
+        lines += _render_log_stats()
+        return "\n".join(lines) + "\n"
+
+
+def _render_pool_stats() -> list[str]:
+    gauges = ("pool_size", "checked_out", "checked_in", "overflow")
+    counters = ("connects", "closes", "invalidations", "checkouts", "checkins")
+    stats = get_pool_stats()
+    lines = []
+    for kind, names in (("gauge", gauges), ("counter", counters)):
+        for name in names:
+            suffix = "_total" if kind == "counter" else ""
+            metric = f"db_pool_{name.removeprefix('pool_')}{suffix}"
+            samples = [
+                f"{metric}{_format_labels(('engine',), (engine,))} {values[name]}"
+                for engine, values in sorted(stats.items())
+                if name in values
+            ]
+            if samples:
+                lines += [f"# TYPE {metric} {kind}"] + samples
+    return lines
+
+
+def _render_log_stats() -> list[str]:
+    stats = log_stats()
+    return [
+        "# HELP log_queue_records Log records waiting for the writer thread.",
+        "# TYPE log_queue_records gauge",
+        f"log_queue_records {stats['queued']}",
+        "# HELP log_records_dropped_total Log records dropped on a full queue.",
+        "# TYPE log_records_dropped_total counter",
+        f"log_records_dropped_total {stats['dropped']}",
+        "# HELP log_records_suppressed_total Log records over the rate limit.",
+        "# TYPE log_records_suppressed_total counter",
+        f"log_records_suppressed_total {stats['suppressed']}",
+    ]
+
+
+request_metrics = RequestMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    stats = current_request_stats.get()
+    if started and stats is not None:
+        stats.record(statement, time.perf_counter() - started.pop())
+    elif started:
+        started.pop()
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    started = connection.info.get("query_started") if connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_queries(engine):
+    """Count and time every statement `engine` executes against the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording latency, status, SQL statement count and DB time
+    per route. Timing spans the whole response, so streamed bodies are included.
+    Requests slower than SLOW_REQUEST_MS are logged with the SQL they ran.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(capture=settings.SLOW_REQUEST_MS > 0)
+        token = current_request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            current_request_stats.reset(token)
+            route = _route_label(scope)
+            request_metrics.observe(
+                scope["method"], route, status_code, duration, stats
+            )
+            if stats.capture and duration * 1000 >= settings.SLOW_REQUEST_MS:
+                log_slow_request(scope, route, status_code, duration, stats)
+
+
+def log_slow_request(scope, route, status_code, duration, stats):
+    logger.warning(
+        {
+            "method": "log_slow_request",
+            "message": "Slow request",
+            "path": scope["path"],
+            "route": route,
+            "http_method": scope["method"],
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "db_time_ms": round(stats.db_time * 1000, 3),
+            "statement_count": stats.statements,
+            "sql": stats.captured,
+        }
+    )
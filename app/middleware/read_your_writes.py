@@ -0,0 +1,57 @@
+# /app/middleware/read_your_writes.py
+
+import math
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+
+from config.config import settings
+from config.database import LAST_WRITE_COOKIE
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def read_only(endpoint):
+    """Mark an endpoint taking a non-GET method that does not write."""
+    endpoint.read_only = True
+    return endpoint
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware stamping successful writes with a short-lived cookie, so
+    the client's following reads skip the replica until it has caught up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not settings.READ_YOUR_WRITES_SECONDS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                # Routing has put the matched endpoint into the scope by now
+                and not getattr(scope.get("endpoint"), "read_only", False)
+            ):
+                cookie = SimpleCookie()
+                cookie[LAST_WRITE_COOKIE] = repr(time.time())
+                cookie[LAST_WRITE_COOKIE]["max-age"] = math.ceil(
+                    settings.READ_YOUR_WRITES_SECONDS
+                )
+                cookie[LAST_WRITE_COOKIE]["path"] = "/"
+                cookie[LAST_WRITE_COOKIE]["httponly"] = True
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", cookie.output(header="").strip())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,282 @@
+"""
+Production entry point: `python -m app.serve`.
+
+The master process imports and warms the application once, binds the
+listening socket and forks WEB_WORKERS workers from it, so workers start
+without repeating the imports and share the unchanged pages copy-on-write.
+Each worker gets fresh connection pools and serves the shared socket with
+uvicorn (uvloop and httptools when installed). SIGTERM or SIGINT drains the
+workers: they stop accepting, finish in-flight requests for up to
+WEB_GRACEFUL_TIMEOUT seconds and run the lifespan shutdown.
+"""
+
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from config.config import settings
+from config.logging_utils import logger, stop_listener
+
+# Seconds between checks of the workers by the master
+SUPERVISE_INTERVAL = 0.5
+# Replacements allowed per minute before the master gives up on crashing workers
+MAX_RESPAWNS_PER_MINUTE = 10
+
+
+def memory_usage() -> dict:
+    """
+    Resident memory of this process in MiB. `private_mb` leaves out the pages
+    still shared with the master, i.e. what the process really adds.
+    """
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            fields = dict(line.split(":", 1) for line in smaps if ":" in line)
+        kib = {name: int(value.split()[0]) for name, value in fields.items()}
+        usage["rss_mb"] = round(kib["Rss"] / 1024, 1)
+        usage["private_mb"] = round(
+            (kib["Private_Clean"] + kib["Private_Dirty"]) / 1024, 1
+        )
+    except (OSError, KeyError, ValueError):
+        import resource
+
+        # Peak rather than current RSS; KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss_mb"] = round(
+            peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+        )
+    return usage
+
+
+def _event_loop() -> str:
+    if settings.WEB_LOOP != "auto":
+        return settings.WEB_LOOP
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _http_protocol() -> str:
+    if settings.WEB_HTTP != "auto":
+        return settings.WEB_HTTP
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(
+        socket.AF_INET6 if ":" in settings.WEB_HOST else socket.AF_INET
+    )
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.WEB_HOST, settings.WEB_PORT))
+    sock.listen(settings.WEB_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that reports how long the worker took to become ready."""
+
+    def __init__(self, config: uvicorn.Config, worker: int, forked_at: float):
+        super().__init__(config)
+        self.worker = worker
+        self.forked_at = forked_at
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        logger.info(
+            {
+                "method": "serve",
+                "message": "Worker ready",
+                "worker": self.worker,
+                "pid": os.getpid(),
+                "startup_seconds": round(time.perf_counter() - self.forked_at, 3),
+                **memory_usage(),
+            }
+        )
+
+
+def shared_state_errors(workers: int) -> list[str]:
+    """
+    Settings that make workers give wrong answers when there is more than one:
+    per-process state that other workers' writes never reach.
+    """
+    errors = []
+    if (
+        workers > 1
+        and settings.REVENUE_CACHE_ENABLED
+        and settings.REVENUE_CACHE_BACKEND == "memory"
+        and not settings.REVENUE_CACHE_HISTORY_TTL
+    ):
+        errors.append(
+            "REVENUE_CACHE_HISTORY_TTL=0 with REVENUE_CACHE_BACKEND=memory: a "
+            "back-dated sale only invalidates one worker and the others keep the "
+            "old history revenue forever; use redis or a history TTL"
+        )
+    return errors
+
+
+def run_worker(app, sock: socket.socket, worker: int, forked_at: float):
+    from config.database import dispose_engines_after_fork
+
+    dispose_engines_after_fork()
+    config = uvicorn.Config(
+        app,
+        loop=_event_loop(),
+        http=_http_protocol(),
+        backlog=settings.WEB_BACKLOG,
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+        access_log=settings.WEB_ACCESS_LOG,
+        proxy_headers=True,
+    )
+    WorkerServer(config, worker, forked_at).run(sockets=[sock])
+
+
+class Master:
+    """Forks the workers, replaces the ones that die and drains them on exit."""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.pids: dict[int, int] = {}
+        self.stopping = False
+        self.respawns: list[float] = []
+
+    def spawn(self, worker: int):
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            # The master's handlers must not run in the worker; uvicorn
+            # installs its own for the graceful shutdown
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.app, self.sock, worker, forked_at)
+            except BaseException:
+                logger.exception(
+                    {"method": "serve", "message": "Worker failed", "worker": worker}
+                )
+                code = 1
+            finally:
+                # os._exit skips atexit; write out the queued log records
+                stop_listener()
+                os._exit(code)
+        self.pids[pid] = worker
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def reap(self):
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.pids.clear()
+                return
+            if pid == 0:
+                return
+            worker = self.pids.pop(pid, None)
+            if worker is None or self.stopping:
+                continue
+            logger.warning(
+                {
+                    "method": "serve",
+                    "message": "Worker exited, replacing it",
+                    "worker": worker,
+                    "pid": pid,
+                    "exit_code": os.waitstatus_to_exitcode(status),
+                }
+            )
+            now = time.monotonic()
+            self.respawns = [t for t in self.respawns if now - t < 60] + [now]
+            if len(self.respawns) > MAX_RESPAWNS_PER_MINUTE:
+                logger.error(
+                    {"method": "serve", "message": "Workers keep failing, stopping"}
+                )
+                self.stopping = True
+                return
+            self.spawn(worker)
+
+    def drain(self):
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Workers bound their own drain by WEB_GRACEFUL_TIMEOUT; allow for the
+        # lifespan shutdown on top before killing what is left
+        deadline = time.monotonic() + settings.WEB_GRACEFUL_TIMEOUT + 5
+        while self.pids and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.pids:
+            logger.warning(
+                {
+                    "method": "serve",
+                    "message": "Killing worker after drain timeout",
+                    "pid": pid,
+                }
+            )
+            os.kill(pid, signal.SIGKILL)
+        while self.pids:
+            self.reap()
+            time.sleep(0.1)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for worker in range(self.workers):
+            self.spawn(worker)
+        while not self.stopping:
+            self.reap()
+            time.sleep(SUPERVISE_INTERVAL)
+        logger.info({"method": "serve", "message": "Draining workers"})
+        self.drain()
+        self.sock.close()
+
+
+def main():
+    started = time.perf_counter()
+    from app.main import app
+
+    # Build the OpenAPI schema now so every worker inherits it
+    app.openapi()
+    workers = settings.WEB_WORKERS or os.cpu_count() or 1
+    errors = shared_state_errors(workers)
+    if errors:
+        logger.error(
+            {
+                "method": "serve",
+                "message": f"Refusing to start {workers} workers",
+                "errors": errors,
+            }
+        )
+        sys.exit(1)
+    sock = bind_socket()
+    logger.info(
+        {
+            "method": "serve",
+            "message": "Application preloaded",
+            "pid": os.getpid(),
+            "workers": workers,
+            "address": f"{settings.WEB_HOST}:{settings.WEB_PORT}",
+            "loop": _event_loop(),
+            "http": _http_protocol(),
+            "preload_seconds": round(time.perf_counter() - started, 3),
+            **memory_usage(),
+        }
+    )
+
+    if workers == 1 or not hasattr(os, "fork"):
+        run_worker(app, sock, 0, time.perf_counter())
+        return
+    Master(app, sock, workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Synthetic dataset generator for benchmarks.
+
+Seeds products, inventory, sales and inventory_history at a configurable scale
+with skew that resembles a real catalogue: a few categories and products carry
+most of the sales, weekends and the end of the year sell more, and volume grows
+over the date range. The same --seed and --end-date always produce the same data.
+
+Rows are generated and loaded in batches (COPY on Postgres, executemany
+elsewhere), so memory stays flat however many sales are requested.
+
+    python -m benchmarks.dataset --products 10000 --sales 50000000 --reset
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, insert, text
+
+from app.baselayer.basemodel import utc_now
+from app.baselayer.dialect import copy_rows, dialect_name, supports_copy
+from app.inventory.models import (
+    DailyRevenue,
+    Inventory,
+    InventoryHistory,
+    InventoryHistoryDaily,
+    Product,
+    Sale,
+)
+from app.inventory.partitions import add_months, ensure_month_partition, month_start
+from app.inventory.rollup import rebuild_daily_revenue
+from config.database import session_scope
+
+CATEGORIES = [
+    "electronics",
+    "clothing",
+    "home",
+    "beauty",
+    "sports",
+    "toys",
+    "books",
+    "grocery",
+    "garden",
+    "automotive",
+    "office",
+    "pets",
+    "jewelry",
+    "music",
+    "health",
+    "baby",
+    "tools",
+    "shoes",
+    "games",
+    "outdoor",
+]
+
+# Quantity per sale: mostly single units
+QUANTITY_WEIGHTS = {1: 60, 2: 20, 3: 10, 4: 5, 5: 3, 10: 2}
+
+# Share of products generated with 10 units or fewer in stock
+LOW_STOCK_SHARE = 0.05
+
+TABLES_IN_LOAD_ORDER = [Product, Inventory, Sale, InventoryHistory]
+
+
+def zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative weights for `random.choices` where rank r has weight 1 / r**exponent."""
+    return list(accumulate(1 / rank**exponent for rank in range(1, count + 1)))
+
+
+def day_cum_weights(start: date, days: int, growth: float) -> list[float]:
+    """Cumulative weights of each day: linear growth, busier weekends and Nov/Dec."""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weight = 1 + growth * offset / max(days - 1, 1)
+        if day.weekday() >= 5:
+            weight *= 1.3
+        if day.month in (11, 12):
+            weight *= 1.5
+        weights.append(weight)
+    return list(accumulate(weights))
+
+
+class DatasetGenerator:
+    def __init__(self, args, product_offset: int):
+        self.rng = random.Random(args.seed)
+        self.products = args.products
+        self.product_offset = product_offset
+        self.start = args.end_date - timedelta(days=args.days - 1)
+        self.days = args.days
+        self.now = utc_now()
+
+        # Popularity rank is shuffled so it is independent of category and id
+        category_weights = zipf_cum_weights(len(CATEGORIES), 1.0)
+        self.categories = self.rng.choices(
+            CATEGORIES, cum_weights=category_weights, k=self.products
+        )
+        self.prices = [
+            round(min(self.rng.lognormvariate(3.0, 1.0), 5000.0), 2)
+            for _ in range(self.products)
+        ]
+        self.popular = list(range(self.products))
+        self.rng.shuffle(self.popular)
+        self.popularity = zipf_cum_weights(self.products, args.skew)
+        self.day_weights = day_cum_weights(self.start, self.days, args.growth)
+        self.quantities = list(QUANTITY_WEIGHTS)
+        self.quantity_weights = list(accumulate(QUANTITY_WEIGHTS.values()))
+
+    def _timestamps(self) -> dict:
+        return {"created_at": self.now, "updated_at": self.now, "is_deleted": False}
+
+    def _pick_products(self, count: int) -> list[int]:
+        ranks = self.rng.choices(
+            range(self.products), cum_weights=self.popularity, k=count
+        )
+        return [self.popular[rank] for rank in ranks]
+
+    def _pick_days(self, count: int) -> list[int]:
+        return self.rng.choices(range(self.days), cum_weights=self.day_weights, k=count)
+
+    def products_batches(self, batch_size: int):
+        for first in range(0, self.products, batch_size):
+            yield [
+                {
+                    "id": self.product_offset + index + 1,
+                    "name": f"Product {self.product_offset + index + 1}",
+                    "category": self.categories[index],
+                    "price": self.prices[index],
+                    **self._timestamps(),
+                }
+                for index in range(first, min(first + batch_size, self.products))
+            ]
+
+    def inventory_batches(self, batch_size: int):
+        for first in range(0, self.products, batch_size):
+            rows = []
+            for index in range(first, min(first + batch_size, self.products)):
+                if self.rng.random() < LOW_STOCK_SHARE:
+                    quantity = self.rng.randint(0, 10)
+                else:
+                    quantity = self.rng.randint(11, 1000)
+                rows.append(
+                    {
+                        "product_id": self.product_offset + index + 1,
+                        "current_quantity": quantity,
+                        "last_updated": self.now,
+                        **self._timestamps(),
+                    }
+                )
+            yield rows
+
+    def sales_batches(self, total: int, batch_size: int):
+        for first in range(0, total, batch_size):
+            count = min(batch_size, total - first)
+            products = self._pick_products(count)
+            days = self._pick_days(count)
+            quantities = self.rng.choices(
+                self.quantities, cum_weights=self.quantity_weights, k=count
+            )
+            yield [
+                {
+                    "product_id": self.product_offset + index + 1,
+                    "quantity": quantity,
+                    "sale_date": self.start + timedelta(days=day),
+                    "total_price": round(self.prices[index] * quantity, 2),
+                    **self._timestamps(),
+                }
+                for index, day, quantity in zip(products, days, quantities)
+            ]
+
+    def history_batches(self, total: int, batch_size: int):
+        start = datetime.combine(self.start, datetime.min.time())
+        for first in range(0, total, batch_size):
+            count = min(batch_size, total - first)
+            products = self._pick_products(count)
+            days = self._pick_days(count)
+            rows = []
+            for index, day in zip(products, days):
+                old_quantity = self.rng.randint(0, 1000)
+                rows.append(
+                    {
+                        "product_id": self.product_offset + index + 1,
+                        "old_quantity": old_quantity,
+                        "new_quantity": max(
+                            old_quantity + self.rng.randint(-50, 200), 0
+                        ),
+                        "change_date": start
+                        + timedelta(days=day, seconds=self.rng.randrange(86400)),
+                        **self._timestamps(),
+                    }
+                )
+            yield rows
+
+
+def load_rows(db, model, rows: list[dict]):
+    """Insert one batch with COPY on Postgres/psycopg2, executemany otherwise."""
+    if not rows:
+        return
+    if supports_copy(db):
+        columns = list(rows[0])
+        copy_rows(
+            db, model.__table__, columns, [tuple(r[c] for c in columns) for r in rows]
+        )
+    else:
+        db.execute(insert(model), rows)
+
+
+def reset_tables(db):
+    if dialect_name(db) == "postgresql":
+        tables = ", ".join(
+            model.__tablename__
+            for model in TABLES_IN_LOAD_ORDER + [DailyRevenue, InventoryHistoryDaily]
+        )
+        db.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    else:
+        for model in [DailyRevenue, InventoryHistoryDaily] + TABLES_IN_LOAD_ORDER[::-1]:
+            db.query(model).delete(synchronize_session=False)
+    db.commit()
+
+
+def ensure_partitions_for_range(db, start: date, end: date):
+    """Create the monthly partitions the generated dates fall into (Postgres only)."""
+    if dialect_name(db) != "postgresql":
+        return
+    month = month_start(start)
+    while month <= end:
+        for model in (Sale, InventoryHistory):
+            ensure_month_partition(db, model.__tablename__, month)
+        month = add_months(month, 1)
+    db.commit()
+
+
+def generate(args) -> dict:
+    started = time.perf_counter()
+    counts = {}
+    with session_scope() as db:
+        if args.reset:
+            reset_tables(db)
+        product_offset = db.query(func.max(Product.id)).scalar() or 0
+        generator = DatasetGenerator(args, product_offset)
+        ensure_partitions_for_range(db, generator.start, args.end_date)
+
+        batches = [
+            (Product, generator.products_batches(args.batch_size)),
+            (Inventory, generator.inventory_batches(args.batch_size)),
+            (Sale, generator.sales_batches(args.sales, args.batch_size)),
+            (
+                InventoryHistory,
+                generator.history_batches(args.history, args.batch_size),
+            ),
+        ]
+        for model, model_batches in batches:
+            table_started = time.perf_counter()
+            loaded = 0
+            for rows in model_batches:
+                load_rows(db, model, rows)
+                db.commit()
+                loaded += len(rows)
+            counts[model.__tablename__] = {
+                "rows": loaded,
+                "elapsed_s": round(time.perf_counter() - table_started, 3),
+            }
+
+        if dialect_name(db) == "postgresql":
+            # Explicit product ids leave the serial sequence behind
+            db.execute(
+                text(
+                    "SELECT setval(pg_get_serial_sequence('products', 'id'), "
+                    "(SELECT max(id) FROM products))"
+                )
+            )
+            db.commit()
+
+        rollup_started = time.perf_counter()
+        counts[DailyRevenue.__tablename__] = {
+            "rows": rebuild_daily_revenue(db, generator.start, args.end_date),
+            "elapsed_s": round(time.perf_counter() - rollup_started, 3),
+        }
+
+        if dialect_name(db) == "postgresql":
+            # VACUUM cannot run inside a transaction block
+            with db.get_bind().connect() as connection:
+                connection.execution_options(isolation_level="AUTOCOMMIT")
+                connection.exec_driver_sql("VACUUM ANALYZE")
+        else:
+            db.execute(text("ANALYZE"))
+            db.commit()
+
+    return {
+        "seed": args.seed,
+        "start_date": str(generator.start),
+        "end_date": str(args.end_date),
+        "tables": counts,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--sales", type=int, default=1000000)
+    parser.add_argument("--history", type=int, default=100000)
+    parser.add_argument(
+        "--days", type=int, default=730, help="Length of the sales history"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="Last day of generated sales (fix it for byte-identical datasets)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.1,
+        help="Zipf exponent of product popularity; higher concentrates sales on fewer products",
+    )
+    parser.add_argument(
+        "--growth",
+        type=float,
+        default=1.0,
+        help="Relative increase in daily volume from the first to the last day",
+    )
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument(
+        "--reset", action="store_true", help="Empty the tables before loading"
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(generate(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Endpoint benchmark suite.
+
+Drives every route of the inventory API in-process through the ASGI app (no
+sockets, no network) at fixed concurrency levels against the configured
+database, and writes p50/p95/p99 latency and throughput per scenario to a JSON
+file that can be diffed between commits. Seed data first with
+`python -m benchmarks.dataset`.
+
+    python -m benchmarks.endpoints --concurrency 1 8 32 --requests 500 --output bench.json
+
+Read scenarios run before write scenarios, which change the dataset; reseed
+between runs that should be compared. Set REVENUE_CACHE_ENABLED=false to
+measure the revenue queries rather than the cache.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+import httpx
+from sqlalchemy import func
+
+from app.baselayer.dialect import dialect_name
+from app.inventory.models import Inventory, Product, Sale
+from app.main import app
+from config.config import settings
+from config.database import session_scope
+
+
+@dataclass
+class Scenario:
+    name: str
+    # Builds the keyword arguments of `httpx.AsyncClient.request` from a random source
+    build: Callable[[random.Random], dict]
+    writes: bool = False
+
+
+@dataclass
+class Fixtures:
+    """Ids and ranges sampled from the seeded dataset."""
+
+    product_ids: list
+    categories: list
+    first_day: object
+    last_day: object
+
+
+def load_fixtures(sample_size: int = 1000) -> Fixtures:
+    with session_scope() as db:
+        product_ids = [
+            row[0]
+            for row in db.query(Inventory.product_id)
+            .order_by(Inventory.product_id)
+            .limit(sample_size)
+        ]
+        categories = [row[0] for row in db.query(Product.category).distinct()]
+        first_day, last_day = db.query(
+            func.min(Sale.sale_date), func.max(Sale.sale_date)
+        ).one()
+    if not product_ids or first_day is None:
+        raise SystemExit("No data to benchmark; run `python -m benchmarks.dataset`")
+    return Fixtures(product_ids, categories, first_day, last_day)
+
+
+def build_scenarios(fixtures: Fixtures) -> list[Scenario]:
+    def product(rng):
+        return rng.choice(fixtures.product_ids)
+
+    def category(rng):
+        return rng.choice(fixtures.categories)
+
+    def window(rng, days):
+        span = max((fixtures.last_day - fixtures.first_day).days - days, 0)
+        start = fixtures.first_day + timedelta(days=rng.randint(0, span))
+        return {"start_date": str(start), "end_date": str(start + timedelta(days=days))}
+
+    def periods(rng):
+        return [window(rng, 30), window(rng, 30)]
+
+    def sale(rng):
+        return {
+            "product_id": product(rng),
+            "quantity": 1,
+            "sale_date": str(fixtures.last_day),
+            "total_price": 1.0,
+        }
+
+    return [
+        Scenario(
+            "sales_by_product",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/sales",
+                "params": {"product_id": product(rng), "limit": 100},
+            },
+        ),
+        Scenario(
+            "sales_by_category_window",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/sales",
+                "params": {"category": category(rng), "limit": 100, **window(rng, 7)},
+            },
+        ),
+        Scenario(
+            "sales_stream_product_month",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/sales/stream",
+                "params": {"product_id": product(rng), **window(rng, 30)},
+            },
+        ),
+        Scenario(
+            "export_sales_csv_day",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/export/sales",
+                "params": {"format": "csv", **window(rng, 0)},
+            },
+        ),
+        Scenario(
+            "export_inventory_history_ndjson",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/export/inventory_history",
+                "params": {"format": "ndjson", "product_id": product(rng)},
+            },
+        ),
+        Scenario(
+            "revenue_daily",
+            lambda rng: {"method": "GET", "url": "/inventory/revenue/daily"},
+        ),
+        Scenario(
+            "revenue_monthly_category",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/revenue/monthly",
+                "params": {"category": category(rng)},
+            },
+        ),
+        Scenario(
+            "revenue_comparison",
+            lambda rng: {
+                "method": "POST",
+                "url": "/inventory/revenue/comparison",
+                "json": {"periods": periods(rng), "category": category(rng)},
+            },
+        ),
+        Scenario(
+            "inventory_low_stock",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/inventory",
+                "params": {"low_stock_threshold": 10},
+            },
+        ),
+        Scenario(
+            "inventory_low_stock_page",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/inventory",
+                "params": {"low_stock_only": True, "limit": 100},
+            },
+        ),
+        Scenario(
+            "inventory_forecast_category",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/inventory/forecast",
+                "params": {"category": category(rng), "history_days": 365},
+            },
+        ),
+        Scenario(
+            "inventory_top_sellers",
+            lambda rng: {
+                "method": "GET",
+                "url": "/inventory/inventory/top",
+                "params": {"period": "weekly", "category": category(rng)},
+            },
+        ),
+        Scenario(
+            "inventory_history",
+            lambda rng: {
+                "method": "GET",
+                "url": f"/inventory/inventory/history/{product(rng)}",
+                "params": {"days": 90},
+            },
+        ),
+        Scenario(
+            "create_sale",
+            lambda rng: {
+                "method": "POST",
+                "url": "/inventory/sales",
+                "json": sale(rng),
+            },
+            writes=True,
+        ),
+        Scenario(
+            "create_sales_bulk_100",
+            lambda rng: {
+                "method": "POST",
+                "url": "/inventory/sales/bulk",
+                "json": {"sales": [sale(rng) for _ in range(100)]},
+            },
+            writes=True,
+        ),
+        Scenario(
+            "update_inventory",
+            lambda rng: {
+                "method": "PUT",
+                "url": f"/inventory/inventory/{product(rng)}",
+                "params": {"new_quantity": rng.randint(0, 1000)},
+            },
+            writes=True,
+        ),
+    ]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(int(round(fraction * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}:{concurrency}")
+    for _ in range(warmup):
+        await client.request(**scenario.build(rng))
+
+    # Requests are built up front so every run replays the same sequence
+    pending = [scenario.build(rng) for _ in range(requests)]
+    pending.reverse()
+    latencies = []
+    statuses = {}
+
+    async def worker():
+        while pending:
+            request = pending.pop()
+            started = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - started)
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    with session_scope() as db:
+        dialect = dialect_name(db)
+        rows = {
+            model.__tablename__: db.query(func.count(model.id)).scalar()
+            for model in (Product, Sale)
+        }
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "dialect": dialect,
+        "db_async": settings.DB_ASYNC,
+        "revenue_cache": settings.REVENUE_CACHE_ENABLED,
+        "rows": rows,
+    }
+
+
+async def run(args) -> dict:
+    fixtures = load_fixtures()
+    scenarios = build_scenarios(fixtures)
+    if args.scenario:
+        scenarios = [s for s in scenarios if s.name in args.scenario]
+    if args.read_only:
+        scenarios = [s for s in scenarios if not s.writes]
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=None
+    ) as client:
+        for scenario in scenarios:
+            for concurrency in args.concurrency:
+                result = await run_scenario(
+                    client,
+                    scenario,
+                    concurrency,
+                    args.requests,
+                    args.warmup,
+                    args.seed,
+                )
+                print(
+                    f"{result['scenario']:<34} c={concurrency:<4} "
+                    f"{result['throughput_rps']:>9} rps  p50 {result['p50_ms']:>9} ms  "
+                    f"p99 {result['p99_ms']:>9} ms  {result['statuses']}"
+                )
+                results.append(result)
+    return {"environment": environment(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per scenario and level"
+    )
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--scenario", nargs="+", default=None, help="Only run these scenarios"
+    )
+    parser.add_argument(
+        "--read-only", action="store_true", help="Skip scenarios that write"
+    )
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Check that the hot service queries are planned with their intended indexes.
+
+Runs each service call against the configured database, captures the SQL it
+emits and EXPLAINs it. Exits non-zero if an expected index is missing from a
+plan. On Postgres sequential scans are disabled for the check so the result
+does not depend on how much data is seeded.
+
+    python -m benchmarks.explain_indexes
+"""
+
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import event, text
+
+from app.baselayer.dialect import dialect_name
+from app.inventory.models import Inventory, Product, Sale
+from app.inventory.request import SalesFilter
+from app.inventory.services import (
+    analyze_revenue,
+    get_inventory_history,
+    get_low_stock_inventory,
+    get_sales,
+)
+from app.inventory.utils.pagination import encode_cursor
+from config.database import session_scope
+
+
+def capture_statements(db, call) -> list[tuple[str, object]]:
+    """Run `call(db)` and return the (statement, parameters) pairs it executed."""
+    statements = []
+    connection = db.connection()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        call(db)
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    return statements
+
+
+def explain(db, statement: str, parameters) -> str:
+    connection = db.connection()
+    if dialect_name(db) == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in rows)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return "\n".join(row[-1] for row in rows)
+
+
+def index_names(db, index: str) -> set[str]:
+    """
+    Names an index can appear under in a plan: on partitioned Postgres tables
+    each partition has its own copy, attached to (and named after) the parent.
+    """
+    if dialect_name(db) != "postgresql":
+        return {index}
+    children = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :index"
+        ),
+        {"index": index},
+    ).scalars()
+    return {index, *children}
+
+
+def build_checks(db) -> list[tuple[str, callable, str]]:
+    product_id = db.query(Inventory.product_id).limit(1).scalar() or 1
+    category = db.query(Product.category).limit(1).scalar() or "default"
+    last_day = (
+        db.query(Sale.sale_date).order_by(Sale.sale_date.desc()).limit(1).scalar()
+    )
+    last_day = last_day or date.today()
+    window = SalesFilter(
+        product_id=product_id,
+        start_date=last_day - timedelta(days=30),
+        end_date=last_day,
+    )
+    cursor = encode_cursor(last_day - timedelta(days=30), 0)
+
+    return [
+        (
+            "get_sales by product and date range",
+            lambda db: get_sales(db, window, 100),
+            "ix_sales_product_id_sale_date",
+        ),
+        (
+            "get_sales by category",
+            lambda db: get_sales(db, SalesFilter(category=category), 100),
+            "ix_products_category",
+        ),
+        (
+            "get_sales keyset page",
+            lambda db: get_sales(db, SalesFilter(), 100, cursor),
+            "ix_sales_sale_date_id",
+        ),
+        (
+            "get_inventory_history",
+            lambda db: get_inventory_history(db, product_id, 30),
+            "ix_inventory_history_product_id_change_date",
+        ),
+        (
+            "get_low_stock_inventory page",
+            lambda db: get_low_stock_inventory(db, 10, 100),
+            "ix_inventory_current_quantity_product_id",
+        ),
+        (
+            "analyze_revenue by category",
+            lambda db: analyze_revenue(db, "monthly", category),
+            "ix_daily_revenue_category_day",
+        ),
+    ]
+
+
+def main() -> int:
+    failures = 0
+    with session_scope() as db:
+        for name, call, expected_index in build_checks(db):
+            statements = capture_statements(db, call)
+            plans = [explain(db, stmt, params) for stmt, params in statements]
+            names = index_names(db, expected_index)
+            used = any(name in plan for plan in plans for name in names)
+            failures += not used
+            print(f"[{'ok' if used else 'MISSING'}] {name}: expects {expected_index}")
+            if not used:
+                for plan in plans:
+                    print("    " + plan.replace("\n", "\n    "))
+        db.rollback()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
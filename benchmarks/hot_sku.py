@@ -0,0 +1,121 @@
+"""
+Concurrency benchmark for `create_sale` against a single hot SKU.
+
+Seeds one product with a fixed amount of stock, then sells it from many threads
+at once until it runs out. Reports throughput and checks that the final stock
+matches the number of successful sales, i.e. no lost updates and no overselling.
+
+    python -m benchmarks.hot_sku --threads 32 --stock 5000
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from sqlalchemy import delete
+
+from app.inventory.exceptions import OutOfStockError
+from app.inventory.models import (
+    DailyRevenue,
+    Inventory,
+    InventoryHistory,
+    Product,
+    Sale,
+)
+from app.inventory.services import create_sale
+from config.database import session_scope
+
+
+def seed_product(stock: int) -> int:
+    with session_scope() as db:
+        product = Product(name="hot-sku-benchmark", category="benchmark", price=1.0)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, current_quantity=stock))
+        db.commit()
+        return product.id
+
+
+def cleanup(product_id: int):
+    with session_scope() as db:
+        for model in (InventoryHistory, Sale, DailyRevenue, Inventory):
+            db.execute(delete(model).where(model.product_id == product_id))
+        db.execute(delete(Product).where(Product.id == product_id))
+        db.commit()
+
+
+def run(threads: int, stock: int, attempts: int) -> dict:
+    product_id = seed_product(stock)
+    counters = {"sold": 0, "out_of_stock": 0, "errors": 0}
+    lock = threading.Lock()
+    latencies = []
+
+    def sell(_):
+        sale = {
+            "product_id": product_id,
+            "quantity": 1,
+            "sale_date": date.today(),
+            "total_price": 1.0,
+        }
+        started = time.perf_counter()
+        outcome = "sold"
+        with session_scope() as db:
+            try:
+                create_sale(db, sale)
+            except OutOfStockError:
+                outcome = "out_of_stock"
+            except Exception:
+                outcome = "errors"
+        with lock:
+            counters[outcome] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(sell, range(attempts)))
+    elapsed = time.perf_counter() - started
+
+    with session_scope() as db:
+        remaining = (
+            db.query(Inventory.current_quantity)
+            .filter(Inventory.product_id == product_id)
+            .scalar()
+        )
+    cleanup(product_id)
+
+    latencies.sort()
+    return {
+        "threads": threads,
+        "stock": stock,
+        "attempts": attempts,
+        **counters,
+        "remaining_stock": remaining,
+        "consistent": remaining == stock - counters["sold"] and remaining >= 0,
+        "elapsed_s": round(elapsed, 3),
+        "sales_per_s": round(counters["sold"] / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--stock", type=int, default=5000)
+    parser.add_argument(
+        "--attempts",
+        type=int,
+        default=None,
+        help="Number of sale attempts (default: 110%% of stock, to exercise sell-out)",
+    )
+    args = parser.parse_args()
+
+    attempts = args.attempts or int(args.stock * 1.1)
+    print(json.dumps(run(args.threads, args.stock, attempts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Per-row CPU cost of serializing list responses.
+
+Builds in-memory ORM objects and rows shaped like the list endpoints return
+them (no database involved) and times turning them into a response body:
+
+- fastapi_json: FastAPI's response_model handling plus the stdlib-json JSONResponse
+- fastapi_orjson: the same handling rendered with ORJSONResponse
+- type_adapter: FastResponder.send_model_response, one pydantic-core pass
+
+    python -m benchmarks.serialization --rows 1000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.baselayer.baseview import FastResponder
+from app.inventory.models import Sale
+from app.inventory.request import InventoryResponse
+from app.inventory.response import SalePageResponse
+
+
+def sales_page(count: int) -> dict:
+    start = date(2025, 1, 1)
+    items = [
+        Sale(
+            id=index + 1,
+            product_id=index % 1000 + 1,
+            quantity=index % 5 + 1,
+            sale_date=start + timedelta(days=index % 365),
+            total_price=9.99 * (index % 5 + 1),
+        )
+        for index in range(count)
+    ]
+    return {"items": items, "next_cursor": "MjAyNS0xMi0zMXwxMDAwMDA"}
+
+
+def inventory_rows(count: int) -> list[dict]:
+    now = datetime(2025, 6, 1, 12, 30)
+    return [
+        {
+            "product_id": index + 1,
+            "product_name": f"Product {index + 1}",
+            "category": "electronics",
+            "current_quantity": index % 500,
+            "last_updated": now,
+            "low_stock": index % 500 < 10,
+        }
+        for index in range(count)
+    ]
+
+
+def fastapi_path(response_type, response_class):
+    field = create_model_field(
+        name="Response_benchmark", type_=response_type, mode="serialization"
+    )
+
+    loop = asyncio.new_event_loop()
+
+    def render(content) -> bytes:
+        encoded = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return response_class(encoded).body
+
+    return render
+
+
+def type_adapter_path(response_type):
+    def render(content) -> bytes:
+        return FastResponder.send_model_response(response_type, content).body
+
+    return render
+
+
+CASES = {
+    "sales_page": (SalePageResponse, sales_page),
+    "inventory": (List[InventoryResponse], inventory_rows),
+}
+
+
+def measure(render, content, repeats: int) -> tuple[float, bytes]:
+    """Lowest CPU time of `repeats` renders, to filter out noise."""
+    best = float("inf")
+    body = b""
+    for _ in range(repeats):
+        started = time.process_time()
+        body = render(content)
+        best = min(best, time.process_time() - started)
+    return best, body
+
+
+def run(rows: list[int], repeats: int) -> list[dict]:
+    results = []
+    for case, (response_type, build) in CASES.items():
+        paths = {
+            "fastapi_json": fastapi_path(response_type, JSONResponse),
+            "fastapi_orjson": fastapi_path(response_type, ORJSONResponse),
+            "type_adapter": type_adapter_path(response_type),
+        }
+        for count in rows:
+            content = build(count)
+            bodies = {}
+            for path, render in paths.items():
+                elapsed, body = measure(render, content, repeats)
+                bodies[path] = json.loads(body)
+                results.append(
+                    {
+                        "case": case,
+                        "path": path,
+                        "rows": count,
+                        "cpu_s": round(elapsed, 4),
+                        "us_per_row": round(elapsed / count * 1e6, 3),
+                        "bytes": len(body),
+                    }
+                )
+            if len({json.dumps(body, sort_keys=True) for body in bodies.values()}) != 1:
+                raise SystemExit(f"{case}: serialization paths disagree")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--output", default=None, help="Also write results to this file"
+    )
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeats)
+    for result in results:
+        print(
+            f"{result['case']:<12} {result['path']:<15} {result['rows']:>8} rows  "
+            f"{result['us_per_row']:>8} us/row"
+        )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
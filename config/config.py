@@ -13,12 +13,170 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("USER_DB_NAME", "gencode")
     DB_HOST: str = os.getenv("USER_DB_HOST", "localhost")
     DB_PORT: str = os.getenv("USER_DB_PORT", "5432")
+    # Serve requests through the async engine instead of the threadpool
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+    # Defaults to DB_URL with its async driver (asyncpg / aiosqlite)
+    ASYNC_DB_URL: str = os.getenv("ASYNC_DB_URL", "")
+
+    # Read replica for the sales listing, revenue and forecast reads; empty
+    # sends everything to the primary
+    REPLICA_DB_URL: str = os.getenv("REPLICA_DB_URL", "")
+    # Defaults to REPLICA_DB_URL with its async driver
+    ASYNC_REPLICA_DB_URL: str = os.getenv("ASYNC_REPLICA_DB_URL", "")
+    # Reads fall back to the primary while the replica lags more than this
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+    # Seconds between replica availability and lag checks
+    REPLICA_CHECK_SECONDS: float = float(os.getenv("REPLICA_CHECK_SECONDS", 1))
+    # A client that wrote reads from the primary for this many seconds; 0 disables it
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+    # Connection pool settings
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Seconds after which a connection is replaced; -1 keeps connections forever
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Per-connection Postgres statement_timeout in milliseconds; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "defaultsecretkey")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 200)
     )
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
 
+    # Sales listing settings
+    SALES_PAGE_MAX_LIMIT: int = int(os.getenv("SALES_PAGE_MAX_LIMIT", 1000))
+    SALES_STREAM_CHUNK_SIZE: int = int(os.getenv("SALES_STREAM_CHUNK_SIZE", 1000))
+    SALES_BULK_MAX_ITEMS: int = int(os.getenv("SALES_BULK_MAX_ITEMS", 50000))
+    SALES_BULK_BATCH_SIZE: int = int(os.getenv("SALES_BULK_BATCH_SIZE", 1000))
+    # Queue single sales and commit them in groups instead of one commit each
+    SALES_GROUP_COMMIT_ENABLED: bool = (
+        os.getenv("SALES_GROUP_COMMIT_ENABLED", "false").lower() == "true"
+    )
+    # A group is committed once this many sales wait, or after the interval
+    SALES_GROUP_COMMIT_MAX_BATCH: int = int(
+        os.getenv("SALES_GROUP_COMMIT_MAX_BATCH", 500)
+    )
+    SALES_GROUP_COMMIT_INTERVAL_MS: float = float(
+        os.getenv("SALES_GROUP_COMMIT_INTERVAL_MS", 5)
+    )
+    # Sales queued at most; further requests wait up to the enqueue timeout
+    # (seconds) for room, then get 503
+    SALES_GROUP_COMMIT_QUEUE_DEPTH: int = int(
+        os.getenv("SALES_GROUP_COMMIT_QUEUE_DEPTH", 10000)
+    )
+    SALES_GROUP_COMMIT_ENQUEUE_TIMEOUT: float = float(
+        os.getenv("SALES_GROUP_COMMIT_ENQUEUE_TIMEOUT", 1)
+    )
+    # Rows per server-side cursor fetch and per CSV chunk / Parquet row group
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", 10000))
+
+    # Inventory settings; bulk updates run as one statement, so the size is
+    # bounded by the driver's bind parameter limit (3 per item)
+    INVENTORY_BULK_MAX_ITEMS: int = int(os.getenv("INVENTORY_BULK_MAX_ITEMS", 10000))
+    INVENTORY_PAGE_MAX_LIMIT: int = int(os.getenv("INVENTORY_PAGE_MAX_LIMIT", 1000))
+    # Stock below this is low; crossing it publishes a low-stock event
+    LOW_STOCK_THRESHOLD: int = int(os.getenv("LOW_STOCK_THRESHOLD", 10))
+    # "memory" (per process) or "redis" (shared by all workers)
+    LOW_STOCK_EVENT_BACKEND: str = os.getenv("LOW_STOCK_EVENT_BACKEND", "memory")
+    # Events buffered per stream client before further ones are dropped
+    LOW_STOCK_EVENT_QUEUE_SIZE: int = int(os.getenv("LOW_STOCK_EVENT_QUEUE_SIZE", 1000))
+    # Seconds between keep-alive comments on idle event streams
+    EVENT_STREAM_KEEPALIVE: float = float(os.getenv("EVENT_STREAM_KEEPALIVE", 15))
+    # Days of raw inventory_history kept before compaction into daily summaries
+    INVENTORY_HISTORY_RAW_DAYS: int = int(os.getenv("INVENTORY_HISTORY_RAW_DAYS", 90))
+    # Raw rows summarized and deleted per compaction transaction
+    INVENTORY_HISTORY_COMPACT_BATCH_SIZE: int = int(
+        os.getenv("INVENTORY_HISTORY_COMPACT_BATCH_SIZE", 5000)
+    )
+    # Longest sales history, in days, a stock-out forecast may look back over
+    FORECAST_MAX_HISTORY_DAYS: int = int(os.getenv("FORECAST_MAX_HISTORY_DAYS", 730))
+    # Products whose demand matrix a forecast holds in memory at once
+    FORECAST_CHUNK_PRODUCTS: int = int(os.getenv("FORECAST_CHUNK_PRODUCTS", 10000))
+
+    # Top sellers of the current day and week, kept in memory by each worker
+    LEADERBOARD_ENABLED: bool = (
+        os.getenv("LEADERBOARD_ENABLED", "true").lower() == "true"
+    )
+    # Products ranked per metric and category
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", 100))
+    # Seconds between rebuilds from the database, bounding drift between workers
+    LEADERBOARD_RECONCILE_SECONDS: float = float(
+        os.getenv("LEADERBOARD_RECONCILE_SECONDS", 60)
+    )
+
+    # Revenue analysis settings
+    REVENUE_COMPARISON_MAX_PERIODS: int = int(
+        os.getenv("REVENUE_COMPARISON_MAX_PERIODS", 24)
+    )
+
+    # Revenue result cache settings
+    REVENUE_CACHE_ENABLED: bool = (
+        os.getenv("REVENUE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    # "memory" (per process) or "redis" (shared by all workers)
+    REVENUE_CACHE_BACKEND: str = os.getenv("REVENUE_CACHE_BACKEND", "memory")
+    REVENUE_CACHE_MAX_ENTRIES: int = int(os.getenv("REVENUE_CACHE_MAX_ENTRIES", 1024))
+    # Seconds; applies to results that include today's data
+    REVENUE_CACHE_TTL: float = float(os.getenv("REVENUE_CACHE_TTL", 60))
+    # Seconds; applies to results covering past days only. It bounds how long a
+    # memory cache serves history another process changed; 0 keeps them until
+    # invalidated, which needs the redis backend once there are other processes
+    REVENUE_CACHE_HISTORY_TTL: float = float(
+        os.getenv("REVENUE_CACHE_HISTORY_TTL", 300)
+    )
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Conditional GET: ETags derived from per-dataset write counters
+    ETAG_ENABLED: bool = os.getenv("ETAG_ENABLED", "true").lower() == "true"
+    # Cache-Control sent with ETag'd responses, per route; empty sends none
+    CACHE_CONTROL_INVENTORY: str = os.getenv("CACHE_CONTROL_INVENTORY", "no-cache")
+    CACHE_CONTROL_REVENUE: str = os.getenv("CACHE_CONTROL_REVENUE", "no-cache")
+
+    # Monthly partitions to keep created ahead of the current month (Postgres)
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+
+    # Serving settings of `python -m app.serve`
+    WEB_HOST: str = os.getenv("WEB_HOST", "0.0.0.0")
+    WEB_PORT: int = int(os.getenv("WEB_PORT", 8000))
+    # Worker processes; 0 starts one per CPU
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", 0))
+    # "auto" uses uvloop / httptools when installed
+    WEB_LOOP: str = os.getenv("WEB_LOOP", "auto")
+    WEB_HTTP: str = os.getenv("WEB_HTTP", "auto")
+    # Pending connections the listening socket queues
+    WEB_BACKLOG: int = int(os.getenv("WEB_BACKLOG", 2048))
+    # Seconds an idle keep-alive connection stays open
+    WEB_KEEPALIVE_SECONDS: int = int(os.getenv("WEB_KEEPALIVE_SECONDS", 5))
+    # Seconds a stopping worker lets in-flight requests finish
+    WEB_GRACEFUL_TIMEOUT: int = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 20))
+    WEB_ACCESS_LOG: bool = os.getenv("WEB_ACCESS_LOG", "false").lower() == "true"
+
+    # Request metrics exposed at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Log requests slower than this many milliseconds with their SQL; 0 disables it
+    SLOW_REQUEST_MS: float = float(os.getenv("SLOW_REQUEST_MS", 1000))
+    # Most statements kept per request for the slow-request log
+    SLOW_REQUEST_MAX_STATEMENTS: int = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", 50))
+
+    # Log records buffered for the writer thread; further ones are dropped
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    # Records of one message type logged per window; 0 disables the limit
+    LOG_RATE_LIMIT: int = int(os.getenv("LOG_RATE_LIMIT", 20))
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = float(
+        os.getenv("LOG_RATE_LIMIT_WINDOW_SECONDS", 10)
+    )
+    # Longest logged header value or validation input, in characters
+    LOG_VALUE_MAX_LENGTH: int = int(os.getenv("LOG_VALUE_MAX_LENGTH", 256))
+    # Validation errors logged per failed request
+    LOG_VALIDATION_MAX_ERRORS: int = int(os.getenv("LOG_VALIDATION_MAX_ERRORS", 5))
+    # Comma-separated request headers logged as [REDACTED]
+    LOG_REDACTED_HEADERS: str = os.getenv(
+        "LOG_REDACTED_HEADERS",
+        "authorization,proxy-authorization,cookie,set-cookie,x-api-key",
+    )
+
     # Construct the database URL
     DB_URL: str = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
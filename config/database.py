@@ -1,20 +1,226 @@
+import time
+from contextlib import contextmanager
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 
 from config.config import settings
+from config.db_pool import engine_options, instrument_engine
+from config.db_replica import ReplicaMonitor
 
 SQLALCHEMY_DATABASE_URL = settings.DB_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)
+)
+pool_metrics = {"sync": instrument_engine(engine)}
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart."""
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# The async engine is only built when enabled so its driver stays optional
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_url = settings.ASYNC_DB_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url, **engine_options(async_url, is_async=True)
+    )
+    pool_metrics["async"] = instrument_engine(async_engine.sync_engine)
+    # Objects are serialized after the session is done with them, which must not
+    # trigger a lazy refresh outside of the async context
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+# Read-only replica for the analytics reads, see `get_read_session`
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = None
+AsyncReplicaSessionLocal = None
+replica_monitor = None
+if settings.REPLICA_DB_URL:
+    replica_engine = create_engine(
+        settings.REPLICA_DB_URL, **engine_options(settings.REPLICA_DB_URL)
+    )
+    pool_metrics["replica"] = instrument_engine(replica_engine)
+    # Sessions carry where they read from, see `is_replica`
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True}
+    )
+    replica_monitor = ReplicaMonitor(
+        replica_engine,
+        settings.REPLICA_MAX_LAG_SECONDS,
+        settings.REPLICA_CHECK_SECONDS,
+    )
+    if settings.DB_ASYNC:
+        async_replica_url = settings.ASYNC_REPLICA_DB_URL or to_async_url(
+            settings.REPLICA_DB_URL
+        )
+        async_replica_engine = create_async_engine(
+            async_replica_url, **engine_options(async_replica_url, is_async=True)
+        )
+        pool_metrics["async_replica"] = instrument_engine(
+            async_replica_engine.sync_engine
+        )
+        AsyncReplicaSessionLocal = async_sessionmaker(
+            async_replica_engine,
+            autoflush=False,
+            expire_on_commit=False,
+            info={"replica": True},
+        )
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Cookie set on responses to writes, see app.middleware.read_your_writes
+LAST_WRITE_COOKIE = "last_write"
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client wrote within the last READ_YOUR_WRITES_SECONDS."""
+    if not settings.READ_YOUR_WRITES_SECONDS:
+        return False
+    try:
+        written_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+def _read_from_replica(request: Request) -> bool:
+    # The lag check only runs once per REPLICA_CHECK_SECONDS
+    return (
+        replica_monitor is not None
+        and not wrote_recently(request)
+        and replica_monitor.usable()
+    )
+
+
+def get_read_db(request: Request):
+    """
+    Session for read-only services: the replica when it is configured, up and
+    within REPLICA_MAX_LAG_SECONDS of the primary, otherwise the primary.
+    Clients that just wrote read from the primary to see their own writes.
+    """
+    db = ReplicaSessionLocal() if _read_from_replica(request) else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    if replica_monitor is not None and replica_monitor.check_due:
+        replica = await run_in_threadpool(_read_from_replica, request)
+    else:
+        replica = _read_from_replica(request)
+    async with (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)() as db:
+        yield db
+
+
+def is_replica(db) -> bool:
+    """Whether `db` reads from the replica, and so may trail recent writes."""
+    return bool(db.info.get("replica"))
+
+
+# Either kind of session a route may receive from `get_session`
+AnySession = Session | AsyncSession
+
+# Session dependencies used by the routes, chosen by the DB_ASYNC setting
+get_session = get_async_db if settings.DB_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DB_ASYNC else get_read_db
+
+
+async def run_db(db, service, *args, **kwargs):
+    """
+    Run a synchronous service function against the request session.
+
+    With an AsyncSession the service runs through `run_sync`, so its queries are
+    awaited on the event loop and concurrency is bounded by the connection pool.
+    With a plain Session it runs in Starlette's threadpool as before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(service, *args, **kwargs)
+    return await run_in_threadpool(service, db, *args, **kwargs)
+
+
+def run_blocking(call, *args, **kwargs):
+    """
+    Make a blocking call, e.g. a Redis round trip, from a service. Services run
+    by `run_db` with an AsyncSession execute on the event loop thread, so there
+    the call is handed to the threadpool and awaited; elsewhere the service is
+    already off the loop and makes the call directly.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(call, *args, **kwargs))
+    return call(*args, **kwargs)
+
+
+@contextmanager
+def session_scope():
+    """
+    Open a session outside of the request dependency graph, e.g. for streaming
+    responses whose body is produced after the route handler has returned.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dispose_engines_after_fork():
+    """
+    Give a forked worker pools of its own. Connections inherited from the
+    parent are dropped without closing them, as they are the parent's.
+    """
+    for db_engine in (engine, replica_engine):
+        if db_engine is not None:
+            db_engine.dispose(close=False)
+    for db_engine in (async_engine, async_replica_engine):
+        if db_engine is not None:
+            db_engine.sync_engine.dispose(close=False)
+
+
+def get_pool_stats() -> dict:
+    """Return live pool gauges and cumulative counters for every engine."""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    if async_replica_engine is not None:
+        engines["async_replica"] = async_replica_engine.sync_engine
+    return {
+        name: pool_metrics[name].snapshot(db_engine.pool)
+        for name, db_engine in engines.items()
+    }
@@ -0,0 +1,133 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config.config import settings
+
+
+class PoolMetrics:
+    """Thread-safe counters for connection pool activity, fed by pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe_checkout_wait(self, seconds: float):
+        with self._lock:
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_wait_avg_ms": round(
+                    (
+                        self.checkout_wait_total / self.checkouts * 1000
+                        if self.checkouts
+                        else 0.0
+                    ),
+                    3,
+                ),
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                {
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                }
+            )
+        return stats
+
+
+class _TimedCheckoutMixin:
+    """Measure how long callers wait for a connection, including overflow connects."""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_checkout_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Build `create_engine` keyword arguments from the DB_POOL_* settings."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps one connection per thread; there is no pool to size
+        return {}
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def instrument_engine(engine) -> PoolMetrics:
+    """Attach pool metrics and per-connection session settings to an engine."""
+    metrics = PoolMetrics()
+    pool = engine.pool
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.metrics = metrics
+
+    event.listen(pool, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(pool, "close", lambda *args: metrics.incr("closes"))
+    event.listen(pool, "invalidate", lambda *args: metrics.incr("invalidations"))
+    event.listen(pool, "checkout", lambda *args: metrics.incr("checkouts"))
+    event.listen(pool, "checkin", lambda *args: metrics.incr("checkins"))
+
+    if engine.dialect.name == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+
+        @event.listens_for(pool, "connect")
+        def set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(
+                f"SET statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}"
+            )
+            cursor.close()
+            # psycopg2 opens a transaction for the SET; end it before pooling
+            dbapi_connection.commit()
+
+    return metrics
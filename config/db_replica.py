@@ -0,0 +1,81 @@
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from config.logging_utils import logger
+
+# Seconds since the last replayed transaction, or 0 when nothing received is
+# left to replay (an idle primary sends nothing, which is not lag)
+POSTGRES_REPLICA_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+def replica_lag(connection) -> float:
+    """Replication lag in seconds; databases that do not replicate report 0."""
+    if connection.dialect.name != "postgresql":
+        return 0.0
+    return float(connection.execute(POSTGRES_REPLICA_LAG).scalar() or 0)
+
+
+class ReplicaMonitor:
+    """
+    Decides whether reads may go to the replica: it must answer and lag the
+    primary by at most `max_lag` seconds. The answer is cached for
+    `check_interval` seconds so routing costs no round trip per request; one
+    caller re-checks while the others keep using the previous answer.
+    """
+
+    def __init__(self, engine, max_lag: float, check_interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: float | None = None
+        self._usable = False
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def check_due(self) -> bool:
+        return time.monotonic() >= self._next_check
+
+    def usable(self) -> bool:
+        with self._lock:
+            if not self.check_due:
+                return self._usable
+            self._next_check = time.monotonic() + self.check_interval
+        usable = self._check()
+        if usable != self._usable:
+            log = logger.info if usable else logger.warning
+            log(
+                {
+                    "method": "ReplicaMonitor",
+                    "message": (
+                        "Reading from replica"
+                        if usable
+                        else "Replica unavailable or lagging, reading from primary"
+                    ),
+                    "lag_seconds": self.lag,
+                    "max_lag_seconds": self.max_lag,
+                }
+            )
+        self._usable = usable
+        return usable
+
+    def _check(self) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                self.lag = replica_lag(connection)
+        except SQLAlchemyError:
+            self.lag = None
+            return False
+        return self.lag <= self.max_lag
+
+    def status(self) -> dict:
+        return {"usable": self._usable, "lag_seconds": self.lag}
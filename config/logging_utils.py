@@ -1,7 +1,16 @@
-import sys
+import atexit
 import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
 from pythonjsonlogger import jsonlogger
 
+from config.config import settings
+
 
 class LoggerFormatter(jsonlogger.JsonFormatter):
     def add_fields(self, log_record, record, message_dict):
@@ -9,10 +18,145 @@ class LoggerFormatter(jsonlogger.JsonFormatter):
         log_record["severity"] = record.levelname
 
 
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the caller: records are queued unformatted
+    for the listener thread, and dropped and counted when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; keeping `msg` as is also
+        # keeps dict messages intact for the JSON formatter
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # The handler's own (reentrant) lock, as records come from any thread
+            self.acquire()
+            try:
+                self.dropped += 1
+            finally:
+                self.release()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `limit` records of each message type per `window`
+    seconds. A message type is the `method` and `message` of dict messages,
+    or the unformatted message otherwise. The first record of a type after
+    some were suppressed carries their count as `suppressed`.
+    """
+
+    # Types tracked at most; beyond it the windows start over
+    MAX_TYPES = 10000
+
+    def __init__(self, limit: int, window: float):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.suppressed = 0
+        self._windows: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def message_type(record) -> tuple:
+        if isinstance(record.msg, dict):
+            return record.msg.get("method"), record.msg.get("message")
+        return record.name, str(record.msg)
+
+    def filter(self, record) -> bool:
+        if not self.limit:
+            return True
+        key = self.message_type(record)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                if len(self._windows) >= self.MAX_TYPES:
+                    self._windows.clear()
+                # [window start, records let through, records suppressed]
+                self._windows[key] = [now, 1, 0]
+                if state and state[2]:
+                    record.suppressed = state[2]
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            self.suppressed += 1
+            return False
+
+
+def truncate(value, max_length: int | None = None) -> str:
+    """`value` as a string of at most `max_length` (LOG_VALUE_MAX_LENGTH) characters."""
+    max_length = max_length or settings.LOG_VALUE_MAX_LENGTH
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= max_length:
+        return text
+    return text[:max_length] + f"...[{len(text) - max_length} more]"
+
+
+REDACTED_HEADERS = {
+    name.strip().lower()
+    for name in settings.LOG_REDACTED_HEADERS.split(",")
+    if name.strip()
+}
+
+
+def loggable_headers(headers) -> dict:
+    """Request headers with credentials redacted and long values truncated."""
+    return {
+        name: "[REDACTED]" if name.lower() in REDACTED_HEADERS else truncate(value)
+        for name, value in headers.items()
+    }
+
+
 formatter = LoggerFormatter()
 stream = logging.StreamHandler(stream=sys.stdout)
 stream.setFormatter(formatter)
 
+queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+rate_limit = RateLimitFilter(
+    settings.LOG_RATE_LIMIT, settings.LOG_RATE_LIMIT_WINDOW_SECONDS
+)
+listener = None
+
+
+def start_listener():
+    """Write queued records to stdout from a background thread."""
+    global listener
+    # A fresh queue, as a forked child may inherit the old one's lock held
+    queue_handler.queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    listener = QueueListener(queue_handler.queue, stream, respect_handler_level=True)
+    listener.start()
+
+
+def stop_listener():
+    """Flush what is queued and stop the background thread."""
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+
+def log_stats() -> dict:
+    return {
+        "queued": queue_handler.queue.qsize(),
+        "dropped": queue_handler.dropped,
+        "suppressed": rate_limit.suppressed,
+    }
+
+
 logger = logging.getLogger("user-service-api")
 logger.setLevel(logging.INFO)
-logger.addHandler(stream)
+logger.addFilter(rate_limit)
+logger.addHandler(queue_handler)
+
+start_listener()
+atexit.register(stop_listener)
+# Threads do not survive fork; workers of app.serve need their own listener
+os.register_at_fork(after_in_child=start_listener)
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# The application reads its settings at import, so point it at a throwaway
+# SQLite database before any test module imports it
+os.environ["DB_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("REVENUE_CACHE_ENABLED", "false")
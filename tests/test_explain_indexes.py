@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.inventory.models import (
+    DailyRevenue,
+    Inventory,
+    InventoryHistory,
+    Product,
+    Sale,
+)
+from benchmarks.explain_indexes import (
+    build_checks,
+    capture_statements,
+    explain,
+    index_names,
+)
+from config.database import Base, engine, session_scope
+
+START = date(2025, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def db():
+    Base.metadata.create_all(engine)
+    with session_scope() as db:
+        for product_id in range(1, 21):
+            category = f"category-{product_id % 4}"
+            db.add(
+                Product(
+                    id=product_id,
+                    name=f"product-{product_id}",
+                    category=category,
+                    price=1.0 * product_id,
+                )
+            )
+            db.add(Inventory(product_id=product_id, current_quantity=product_id * 5))
+            for offset in range(0, 60, 3):
+                day = START + timedelta(days=offset)
+                db.add(
+                    Sale(
+                        product_id=product_id,
+                        quantity=1,
+                        sale_date=day,
+                        total_price=1.0 * product_id,
+                    )
+                )
+                db.add(
+                    InventoryHistory(
+                        product_id=product_id,
+                        old_quantity=10,
+                        new_quantity=9,
+                        change_date=datetime.combine(day, datetime.min.time()),
+                    )
+                )
+                db.add(
+                    DailyRevenue(
+                        day=day,
+                        product_id=product_id,
+                        category=category,
+                        total_revenue=1.0 * product_id,
+                        total_quantity=1,
+                        sale_count=1,
+                    )
+                )
+        db.commit()
+        yield db
+        db.rollback()
+    Base.metadata.drop_all(engine)
+
+
+def test_hot_queries_use_their_indexes(db):
+    missing = []
+    for name, call, expected_index in build_checks(db):
+        plans = [
+            explain(db, stmt, params) for stmt, params in capture_statements(db, call)
+        ]
+        names = index_names(db, expected_index)
+        if not any(index in plan for plan in plans for index in names):
+            missing.append(f"{name}: expects {expected_index}\n" + "\n".join(plans))
+    assert not missing, "\n\n".join(missing)